@@ -1,25 +1,27 @@
-import pygame
-from pygame.sprite import Sprite
+from assets import Assets
+from entities import EntitySprite
 
-class AlienBullet(Sprite):
-    """A class to manage bullets fired by aliens."""
+class AlienBullet(EntitySprite):
+    """A class to manage bullets fired by aliens.
 
-    def __init__(self, ai_game, alien):
-        """Create a bullet object at the alien's current position."""
-        super().__init__()
-        self.screen = ai_game.screen
+    The bullet is an entity of the game's 'alien_bullets' archetype, which
+    the game moves, culls and draws for every bullet at once; this sprite
+    stands in for it in groups and collision tests.
+    """
+
+    def __init__(self, ai_game, shooter=None):
+        """Create a bullet, below the shooter rect if one is given."""
         self.settings = ai_game.settings
+        super().__init__(ai_game.entity_store['alien_bullets'],
+                         (self.settings.alien_bullet_width, self.settings.alien_bullet_height))
         self.color = self.settings.alien_bullet_color
 
-        self.rect = pygame.Rect(0, 0, self.settings.alien_bullet_width, self.settings.alien_bullet_height)
-        self.rect.midtop = alien.rect.midbottom
-        self.y = float(self.rect.y)
-
-    def update(self):
-        """Move the bullet down the screen."""
-        self.y += self.settings.alien_bullet_speed
-        self.rect.y = self.y
+        self.mask = Assets.solid_mask(self.rect.size)
+        if shooter is not None:
+            self.reset(shooter)
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def reset(self, shooter):
+        """Move the bullet to just below the shooter rect."""
+        self.rect.midtop = shooter.midbottom
+        self.place(self._rect.topleft, velocity=(0, 1),
+                   collider=self._rect.size, renderable=self.color)
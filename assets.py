@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+class Assets:
+    """A process-wide registry that loads each image, sound and font once.
+
+    Rendered text is kept in a small LRU cache as well, so HUD strings are
+    only re-rendered when their text actually changes.
+
+    Assets can also be loaded on a background thread with
+    load_in_background(). An image still loading is waited for when it's
+    requested; a sound still loading comes back as None, so playing it
+    never stalls a frame.
+    """
+
+    _images = {}
+    _converted = set()
+    _masks = {}
+    _sounds = {}
+    _loading = {}  # Image keys and sound paths -> Event set once loaded
+    _fonts = {}
+    _texts = OrderedDict()
+    max_texts = 256
+
+    @classmethod
+    def image(cls, path, alpha=False):
+        """Return the shared surface for path, converted to the display format."""
+        key = (path, alpha)
+        loading = cls._loading.get(key)
+        if loading:
+            loading.wait()
+        if key not in cls._images:
+            cls._images[key] = pygame.image.load(path)
+
+        # convert() needs a display mode; until one is set, hand out the
+        #   raw surface and convert it on a later request.
+        if key not in cls._converted and pygame.display.get_surface():
+            image = cls._images[key]
+            cls._images[key] = image.convert_alpha() if alpha else image.convert()
+            cls._converted.add(key)
+        return cls._images[key]
+
+    @classmethod
+    def mask(cls, path):
+        """Return the shared collision mask for the image at path.
+
+        The images have no alpha channel, so pixels within a small
+        tolerance of the top-left corner's color count as background.
+        """
+        mask = cls._masks.get(path)
+        if mask is None:
+            image = cls.image(path)
+            mask = pygame.mask.from_threshold(image, image.get_at((0, 0)), (16, 16, 16, 255))
+            mask.invert()
+            cls._masks[path] = mask
+        return mask
+
+    @classmethod
+    def solid_mask(cls, size):
+        """Return a shared fully set mask of size, for solid rects like bullets."""
+        key = ('solid', tuple(size))
+        mask = cls._masks.get(key)
+        if mask is None:
+            mask = pygame.mask.Mask(size, fill=True)
+            cls._masks[key] = mask
+        return mask
+
+    @classmethod
+    def sound(cls, path):
+        """Return the shared Sound for path, or None if it can't be played.
+
+        A sound still loading in the background is also None for now.
+        """
+        loading = cls._loading.get(path)
+        if loading and not loading.is_set():
+            return None
+        if path not in cls._sounds:
+            cls._sounds[path] = cls._load_sound(path)
+        return cls._sounds[path]
+
+    @staticmethod
+    def _load_sound(path):
+        """Load the Sound at path, or return None if it can't be played."""
+        try:
+            return pygame.mixer.Sound(path)
+        except (pygame.error, FileNotFoundError):
+            return None
+
+    @classmethod
+    def load_in_background(cls, images=(), sounds=()):
+        """Load image paths and sound paths on a daemon thread.
+
+        The mixer is initialized on the thread too, since opening the audio
+        device can be slow. Return the thread, or None if everything was
+        already loaded or loading.
+        """
+        images = [(path, False) for path in images
+                  if (path, False) not in cls._images and (path, False) not in cls._loading]
+        sounds = [path for path in sounds
+                  if path not in cls._sounds and path not in cls._loading]
+        if not images and not sounds:
+            return None
+        for key in images + sounds:
+            cls._loading[key] = threading.Event()
+
+        def load():
+            for key in images:
+                try:
+                    cls._images.setdefault(key, pygame.image.load(key[0]))
+                except (pygame.error, FileNotFoundError):
+                    pass  # image() retries, and raises, on the main thread
+                finally:
+                    cls._loading[key].set()
+            if sounds and not pygame.mixer.get_init():
+                try:
+                    pygame.mixer.init()
+                except pygame.error:
+                    pass  # No audio device: every sound is None
+            for path in sounds:
+                cls._sounds[path] = cls._load_sound(path)
+                cls._loading[path].set()
+
+        thread = threading.Thread(target=load, name='asset-loader', daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def font(cls, name=None, size=48):
+        """Return the shared SysFont for name and size.
+
+        The default font is opened directly, which skips SysFont's scan of
+        every installed font.
+        """
+        key = (name, size)
+        if key not in cls._fonts:
+            if name is None:
+                cls._fonts[key] = pygame.font.Font(None, size)
+            else:
+                cls._fonts[key] = pygame.font.SysFont(name, size)
+        return cls._fonts[key]
+
+    @classmethod
+    def text(cls, font, text, color, antialias=True, background=None):
+        """Return a rendered text surface, re-rendering only on a cache miss."""
+        key = (font, text, color, antialias, background)
+        surface = cls._texts.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color, background)
+            cls._texts[key] = surface
+            if len(cls._texts) > cls.max_texts:
+                cls._texts.popitem(last=False)
+        else:
+            cls._texts.move_to_end(key)
+        return surface
@@ -0,0 +1,88 @@
+import pygame
+
+from assets import Assets
+
+
+class AudioManager:
+    """A class to play game sounds through a fixed set of mixer channels.
+
+    play() only queues a sound category for this tick; flush() at the end
+    of the tick starts them. Repeats of a category within coalesce_ms of
+    game time play once, each category only uses the channels reserved for
+    it, and the mixer gets no more channels than are reserved in total, so
+    dense fights can't pile up voices. When a category's channels are all
+    busy, its oldest voice is cut off for the new one.
+
+    Without a mixer (no audio device, or a headless game) every call is a
+    no-op, so callers don't need to check.
+    """
+
+    def __init__(self, ai_game, sounds, enabled=True):
+        """Initialize the manager for a dict of category -> sound path."""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.sounds = sounds
+        self.enabled = enabled
+
+        self.queued = set()
+        self.last_played = {}
+        # Category -> list of [Channel, start time], built once the mixer
+        #   is up, since it initializes on the asset loader thread.
+        self.channels = None
+
+    def play(self, category):
+        """Queue the sound for category to start at the end of this tick."""
+        if self.enabled:
+            self.queued.add(category)
+
+    def flush(self):
+        """Start this tick's queued sounds."""
+        if not self.queued:
+            return
+        queued = self.queued
+        self.queued = set()
+        if self.channels is None and not self._reserve_channels():
+            return
+
+        now = self.ai_game.sim_time
+        for category in queued:
+            last = self.last_played.get(category)
+            if last is not None and now - last < self.settings.sound_coalesce_ms:
+                continue
+            sound = Assets.sound(self.sounds[category])
+            if sound is None:
+                continue
+
+            # Prefer an idle channel; otherwise cut off the oldest voice.
+            slots = self.channels[category]
+            slot = next((slot for slot in slots if not slot[0].get_busy()),
+                        None) or min(slots, key=lambda slot: slot[1])
+            slot[0].play(sound)
+            slot[1] = now
+            self.last_played[category] = now
+
+    def stop(self):
+        """Stop every sound and drop anything queued."""
+        self.queued.clear()
+        if self.channels:
+            for slots in self.channels.values():
+                for channel, _ in slots:
+                    channel.stop()
+
+    def _reserve_channels(self):
+        """Reserve each category's channels; return False without a mixer."""
+        if not pygame.mixer.get_init():
+            return False
+        counts = [self.settings.sound_channels.get(category, 1) for category in self.sounds]
+        total = sum(counts)
+        pygame.mixer.set_num_channels(total)
+        # Reserved channels are never picked by a bare Sound.play().
+        pygame.mixer.set_reserved(total)
+
+        self.channels = {}
+        first = 0
+        for category, count in zip(self.sounds, counts):
+            self.channels[category] = [[pygame.mixer.Channel(first + i), 0]
+                                       for i in range(count)]
+            first += count
+        return True
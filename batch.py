@@ -0,0 +1,190 @@
+"""Run many headless games across all CPU cores for balance sweeps.
+
+    python batch.py --set alien_fire_rate=0.002,0.003,0.004 \\
+                    --set speedup_scale=1.1,1.2 --games 200 -o sweep.jsonl
+
+Every combination of --set values is a settings variant; each variant
+plays --games games with different seeds, driven by a built-in policy.
+Per-game results (score, level reached, ticks survived) are streamed to
+one JSON-lines file as they finish, and a per-variant summary is printed
+at the end.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from settings import Settings
+
+
+def scripted_policy(game, rng):
+    """Chase the nearest alien, fire constantly, and shield when threatened."""
+    ship = game.ship
+    fleet = game.fleet
+    alive = np.flatnonzero(fleet.alive)
+    if len(alive):
+        centers = fleet.x[alive] + fleet.alien_width / 2
+        target = centers[np.argmin(np.abs(centers - ship.rect.centerx))]
+        ship.moving_right = target > ship.rect.centerx + 4
+        ship.moving_left = target < ship.rect.centerx - 4
+    game._fire_bullet()
+
+    for bullet in game.alien_bullets:
+        if (abs(bullet.rect.centerx - ship.rect.centerx) < ship.rect.width
+                and ship.rect.top - bullet.rect.bottom < 120):
+            game._activate_shield_skill()
+            break
+
+
+def random_policy(game, rng):
+    """Mash random inputs, changing them every few ticks."""
+    if game.ticks % 6 == 0:
+        direction = rng.integers(3)
+        game.ship.moving_left = direction == 0
+        game.ship.moving_right = direction == 1
+        if rng.random() < 0.5:
+            game._fire_bullet()
+        if rng.random() < 0.02:
+            game._activate_shield_skill()
+
+
+POLICIES = {'scripted': scripted_policy, 'random': random_policy}
+
+# Settings start_game() resets through initialize_dynamic_settings(); a
+#   variant sets them again once the game has started.
+DYNAMIC_SETTINGS = {'ship_speed', 'bullet_speed', 'alien_speed', 'alien_fire_rate',
+                    'fleet_direction', 'alien_points'}
+
+# Settings derived from others, or never read by a headless game.
+IGNORED_SETTINGS = {'tick_scale', 'window_size', 'scaler', 'dirty_rect_rendering',
+                    'dirty_rect_threshold', 'max_fps', 'max_ticks_per_frame',
+                    'profiling', 'profile_export_path', 'sound_channels',
+                    'sound_coalesce_ms', 'high_score_path', 'leaderboard_path',
+                    'high_score_save_delay'}
+
+
+def make_settings(variant):
+    """Return Settings with the variant's static settings applied.
+
+    A screen size goes through set_arena() so the alien bullet cap grows
+    with it, and tick_rate through set_tick_rate() so speeds keep up.
+    """
+    settings = Settings()
+    if 'screen_width' in variant or 'screen_height' in variant:
+        settings.set_arena(variant.get('screen_width', settings.screen_width),
+                           variant.get('screen_height', settings.screen_height))
+    for name, value in variant.items():
+        if name == 'tick_rate':
+            settings.set_tick_rate(value)
+        elif name not in DYNAMIC_SETTINGS:
+            setattr(settings, name, value)
+    return settings
+
+
+def play_game(job):
+    """Play one headless game and return its result record."""
+    # Imported here so each worker process sets up pygame itself.
+    from main import AlienInvasion
+
+    variant, seed, policy_name, max_ticks = job
+    game = AlienInvasion(headless=True, seed=seed, settings=make_settings(variant))
+    game.start_game()
+    # Applied after start_game, which resets the dynamic settings.
+    for name, value in variant.items():
+        if name in DYNAMIC_SETTINGS:
+            setattr(game.settings, name, value)
+
+    policy = POLICIES[policy_name]
+    rng = np.random.default_rng(seed)
+    while game.game_active and game.ticks < max_ticks:
+        if not game.crash_delay_active:
+            policy(game, rng)
+        game.step()
+
+    return {
+        'variant': variant,
+        'seed': seed,
+        'policy': policy_name,
+        'score': game.stats.score,
+        'level': game.stats.level,
+        'ticks': game.ticks,
+        'finished': not game.game_active,
+    }
+
+
+def parse_value(text):
+    """Return text as an int, float or plain string."""
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_sets(sets):
+    """Turn NAME=V1,V2 options into the list of settings variants."""
+    names, choices = [], []
+    defaults = Settings()
+    for option in sets:
+        name, _, values = option.partition('=')
+        if not values:
+            raise SystemExit(f"--set expects NAME=V1,V2,..., got {option!r}")
+        if not hasattr(defaults, name) or callable(getattr(defaults, name)):
+            raise SystemExit(f"--set: Settings has no attribute {name!r}")
+        if name in IGNORED_SETTINGS:
+            raise SystemExit(f"--set: {name!r} is derived or unused by headless games")
+        names.append(name)
+        choices.append([parse_value(v) for v in values.split(',')])
+    return [dict(zip(names, combo)) for combo in itertools.product(*choices)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2',
+                        help="Settings attribute and the values to sweep")
+    parser.add_argument('--games', type=int, default=20, help="games per variant")
+    parser.add_argument('--policy', choices=POLICIES, default='scripted')
+    parser.add_argument('--max-ticks', type=int, default=60 * 60 * 10,
+                        help="stop a game after this many ticks")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--seed', type=int, default=0, help="first game seed")
+    parser.add_argument('-o', '--output', default='batch_results.jsonl')
+    args = parser.parse_args(argv)
+
+    variants = parse_sets(args.set)
+    jobs = [(variant, args.seed + game, args.policy, args.max_ticks)
+            for variant in variants for game in range(args.games)]
+
+    summary = {}
+    start = perf_counter()
+    pool = multiprocessing.Pool(args.workers)
+    with open(args.output, 'w') as out:
+        for result in pool.imap_unordered(play_game, jobs, chunksize=4):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            key = json.dumps(result['variant'], sort_keys=True)
+            summary.setdefault(key, []).append(result)
+    # Let the workers exit on their own; SIGTERM from terminate() may be
+    #   swallowed by SDL inside them.
+    pool.close()
+    pool.join()
+    elapsed = perf_counter() - start
+
+    print(f"{len(jobs)} games in {elapsed:.1f}s "
+          f"({len(jobs) / elapsed * 3600:.0f} games/hour) -> {args.output}")
+    for key, results in summary.items():
+        scores = [r['score'] for r in results]
+        levels = [r['level'] for r in results]
+        ticks = [r['ticks'] for r in results]
+        print(f"{key}: score {np.mean(scores):.0f} (p50 {np.median(scores):.0f}), "
+              f"level {np.mean(levels):.1f}, ticks {np.mean(ticks):.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
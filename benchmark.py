@@ -0,0 +1,255 @@
+"""Headless scenario benchmarks with regression baselines.
+
+    python benchmark.py                    # run and compare to the baseline
+    python benchmark.py --save-baseline    # run and store a new baseline
+    python benchmark.py bullet_storm -n 300
+
+Each scenario reports mean/p50/p95/p99 update and frame times (update is
+one simulation tick; frame is a tick plus a full render) and, from
+tracemalloc, the most KiB allocated at once inside a frame on top of
+what was allocated before it. Any compared metric worse than the
+baseline by more than the tolerance, or a missing baseline, makes the
+run exit with status 1.
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from main import AlienInvasion
+from settings import Settings
+
+
+BASELINE_PATH = 'benchmark_baseline.json'
+COMPARED = ['update_mean', 'update_p95', 'frame_mean', 'frame_p95', 'alloc_peak_kib']
+
+# Absolute slack on top of the tolerance, so near-zero metrics don't flap
+SLACK = {'alloc_peak_kib': 1.0}
+
+
+def new_game(seed=0, arena=None):
+    """Return a started headless game with every random stream seeded.
+
+    The ship is made invulnerable so scenarios stay in a steady state.
+    arena is an optional (width, height) playfield size.
+    """
+    settings = Settings()
+    if arena:
+        settings.set_arena(*arena)
+    game = AlienInvasion(headless=True, seed=seed, settings=settings)
+    game.start_game()
+    game._ship_hit = lambda: None
+    return game
+
+
+def default_fleet(game, frame):
+    """The fleet from _create_fleet, with the ship sweeping and firing."""
+    if frame == 0:
+        game.ship.moving_right = True
+    if frame % 90 == 0:
+        game.ship.moving_right = not game.ship.moving_right
+        game.ship.moving_left = not game.ship.moving_right
+    if frame % 8 == 0:
+        game._fire_bullet()
+    if not game.aliens:
+        game._create_fleet()
+
+
+def bullet_storm(game, frame):
+    """Alien bullets kept at alien_bullets_allowed, player bullets maxed."""
+    game.settings.alien_fire_rate = 1.0
+    while len(game.bullets) < game.settings.bullets_allowed:
+        game._fire_bullet()
+    if not game.aliens:
+        game._create_fleet()
+
+
+def shield_under_fire(game, frame):
+    """An active shield absorbing a continuous stream of alien bullets."""
+    game.settings.alien_fire_rate = 1.0
+    if not game.shields:
+        game.shield_active = False
+        game.shield_last_used = -game.settings.shield_cooldown
+        game._activate_shield_skill()
+    for shield in game.shields:
+        shield.health = shield.max_health
+    game.fleet.x[:] = np.linspace(game.ship.rect.left - 40, game.ship.rect.right,
+                                  len(game.fleet.x))
+    game.fleet.y[:] = game.settings.screen_height * 0.3
+
+
+def crash_explosion(game, frame):
+    """A ship crash explosion restarted every two seconds."""
+    if frame % 120 == 0:
+        game.crash_particles.clear()
+        game._start_ship_crash()
+
+
+def fleet_respawn(game, frame):
+    """The fleet wiped every 20 frames, so the next tick spawns a new one.
+
+    Every 20th tick includes a level change, so the p95 and p99 update
+    times measure the fleet spawn spike. Settings are restored each time so
+    the speeds don't keep growing.
+    """
+    if frame == 0:
+        game.initial_settings = dict(vars(game.settings))
+    if frame % 20 == 0:
+        vars(game.settings).update(game.initial_settings)
+        game.fleet.clear()
+
+
+def level_20(game, frame):
+    """The default fleet at the speeds reached on level 20."""
+    if frame == 0:
+        for _ in range(19):
+            game.settings.increase_speed()
+        game.stats.level = 20
+        game.sb.prep_level()
+    default_fleet(game, frame)
+
+
+SCENARIOS = {
+    'default_fleet': default_fleet,
+    'bullet_storm': bullet_storm,
+    'shield_under_fire': shield_under_fire,
+    'crash_explosion': crash_explosion,
+    'level_20': level_20,
+    'fleet_respawn': fleet_respawn,
+    'arena_8k': default_fleet,
+    'bullet_storm_8k': bullet_storm,
+}
+
+# Scenarios played on a larger playfield; arena_8k holds about 560 aliens,
+#   and bullet_storm_8k keeps over 400 alien bullets in flight.
+ARENAS = {
+    'arena_8k': (7680, 4320),
+    'bullet_storm_8k': (7680, 4320),
+}
+
+
+def percentile(samples, q):
+    """Return the q-th percentile of samples."""
+    return float(np.percentile(samples, q))
+
+
+def run_scenario(drive, frames, warmup=60, arena=None):
+    """Run one scenario and return its summary metrics."""
+    game = new_game(arena=arena)
+    for frame in range(warmup):
+        drive(game, frame)
+        game.step()
+        game._update_screen()
+
+    update_ms, frame_ms = [], []
+    for frame in range(warmup, warmup + frames):
+        drive(game, frame)
+        start = perf_counter()
+        game.step()
+        updated = perf_counter()
+        game._update_screen()
+        end = perf_counter()
+        update_ms.append((updated - start) * 1000)
+        frame_ms.append((end - start) * 1000)
+
+    # Allocations are measured in a separate pass, since tracemalloc
+    #   slows everything down.
+    tracemalloc.start()
+    peaks = []
+    for frame in range(warmup + frames, warmup + frames + min(frames, 120)):
+        drive(game, frame)
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        game.step()
+        game._update_screen()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    metrics = {}
+    for name, samples in (('update', update_ms), ('frame', frame_ms)):
+        metrics[f'{name}_mean'] = float(np.mean(samples))
+        metrics[f'{name}_p50'] = percentile(samples, 50)
+        metrics[f'{name}_p95'] = percentile(samples, 95)
+        metrics[f'{name}_p99'] = percentile(samples, 99)
+    metrics['alloc_peak_kib'] = float(np.mean(peaks)) / 1024
+    return metrics
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages against baseline."""
+    regressions = []
+    for scenario, metrics in results.items():
+        reference = baseline.get(scenario)
+        if reference is None:
+            continue
+        for key in COMPARED:
+            old, new = reference.get(key), metrics[key]
+            if old is None:
+                continue
+            limit = old * (1 + tolerance) + SLACK.get(key, 0.05)
+            if new > limit:
+                regressions.append(f"{scenario}.{key}: {new:.3f} > baseline {old:.3f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenarios', nargs='*',
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('-n', '--frames', type=int, default=600)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed fractional slowdown before failing")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="exit with status 0 when there's no baseline to compare to")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    results = {}
+    print(f"{'scenario':<18} {'upd mean':>9} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'frm mean':>9} {'p95':>7} {'p99':>7} {'peak KiB':>9}")
+    for name in names:
+        m = run_scenario(SCENARIOS[name], args.frames, arena=ARENAS.get(name))
+        results[name] = m
+        print(f"{name:<18} {m['update_mean']:>9.3f} {m['update_p50']:>7.3f} "
+              f"{m['update_p95']:>7.3f} {m['update_p99']:>7.3f} {m['frame_mean']:>9.3f} "
+              f"{m['frame_p95']:>7.3f} {m['frame_p99']:>7.3f} {m['alloc_peak_kib']:>9.1f}")
+
+    if args.save_baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            baseline = {}
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0 if args.allow_missing_baseline else 1
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nPERFORMANCE REGRESSIONS:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Benchmark the spatial-hash broadphases against pygame.sprite.groupcollide,
+and what the pixel-accurate mask narrow phase adds on top of them.
+
+The sprite grid is SpatialHash; the array grid is overlapping_pairs(), which
+the game runs over bullet and fleet arrays.
+
+Run with: python benchmark_collisions.py
+"""
+import random
+import timeit
+
+import numpy as np
+import pygame
+from pygame.sprite import Group, Sprite
+
+from assets import Assets
+from spatial_hash import overlapping_pairs
+
+
+ARENA = (3840, 2160)
+CASES = [(5, 8), (100, 500), (500, 2000), (2000, 5000)]
+CELL_SIZE = 128
+
+
+class Box(Sprite):
+    """A bare sprite with only a rect, for collision benchmarks."""
+
+    def __init__(self, width, height, rng):
+        super().__init__()
+        self.rect = pygame.Rect(rng.randrange(ARENA[0] - width),
+                                rng.randrange(ARENA[1] - height),
+                                width, height)
+
+
+class MaskedBox(Box):
+    """A sprite with a rect and a cached mask, like the game's sprites."""
+
+    def __init__(self, width, height, rng, mask):
+        super().__init__(width, height, rng)
+        self.mask = mask
+
+
+class SpatialHash:
+    """A uniform grid that buckets sprites by the cells their rects cover.
+
+    The sprite-by-sprite form of overlapping_pairs(): rebuilt with build(),
+    then each query only looks at sprites in the cells its rect touches.
+    An optional collided(target, sprite) narrow phase, such as
+    pygame.sprite.collide_mask, runs only on sprites whose rects hit.
+    """
+
+    def __init__(self, cell_size):
+        """Initialize an empty grid with square cells of cell_size pixels."""
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def build(self, sprites):
+        """Replace the grid contents with sprites."""
+        self.cells.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def insert(self, sprite):
+        """Add sprite to every cell its rect covers."""
+        cells = self.cells
+        for key in self._cell_keys(sprite.rect):
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [sprite]
+            else:
+                bucket.append(sprite)
+
+    def query(self, target, collided=None):
+        """Return the sprites still in a group colliding with target."""
+        rect = getattr(target, 'rect', target)
+        cells = self.cells
+        found = []
+        seen = set()
+        for key in self._cell_keys(rect):
+            for sprite in cells.get(key, ()):
+                if (id(sprite) not in seen and sprite.alive()
+                        and rect.colliderect(sprite.rect)):
+                    seen.add(id(sprite))
+                    if collided is None or collided(target, sprite):
+                        found.append(sprite)
+        return found
+
+    def groupcollide(self, group, dokill, dokill_hashed, collided=None):
+        """Find sprites in group colliding with hashed sprites.
+
+        Matches pygame.sprite.groupcollide(group, hashed, dokill,
+        dokill_hashed, collided): returns a dict mapping each colliding
+        sprite in group to the list of hashed sprites it hit.
+        """
+        collisions = {}
+        for sprite in group.sprites():
+            hits = self.query(sprite, collided)
+            if hits:
+                if dokill_hashed:
+                    for hit in hits:
+                        hit.kill()
+                if dokill:
+                    sprite.kill()
+                collisions[sprite] = hits
+        return collisions
+
+    def _cell_keys(self, rect):
+        """Yield the (column, row) keys of the cells rect covers."""
+        size = self.cell_size
+        left, top = rect.left // size, rect.top // size
+        right, bottom = (rect.right - 1) // size, (rect.bottom - 1) // size
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                yield column, row
+
+
+def make_masked_groups(bullet_count, alien_count, seed=0):
+    """Return (bullets, aliens) groups using the game's alien mask.
+
+    Bullets are packed around the aliens so most rect hits need the
+    narrow phase.
+    """
+    rng = random.Random(seed)
+    alien_mask = Assets.mask('images/alien.bmp')
+    width, height = alien_mask.get_size()
+    bullet_mask = Assets.solid_mask((3, 15))
+    aliens = Group(MaskedBox(width, height, rng, alien_mask) for _ in range(alien_count))
+    targets = aliens.sprites()
+    bullets = Group()
+    for _ in range(bullet_count):
+        bullet = MaskedBox(3, 15, rng, bullet_mask)
+        target = rng.choice(targets).rect
+        bullet.rect.center = (rng.randrange(target.left, target.right),
+                              rng.randrange(target.top, target.bottom))
+        bullets.add(bullet)
+    return bullets, aliens
+
+
+def make_groups(bullet_count, alien_count, seed=0):
+    """Return (bullets, aliens) groups scattered over the arena."""
+    rng = random.Random(seed)
+    bullets = Group(Box(3, 15, rng) for _ in range(bullet_count))
+    aliens = Group(Box(60, 54, rng) for _ in range(alien_count))
+    return bullets, aliens
+
+
+def run_groupcollide(bullets, aliens):
+    """The original O(bullets x aliens) path."""
+    return pygame.sprite.groupcollide(bullets, aliens, False, False)
+
+
+def run_spatial_hash(grid, bullets, aliens):
+    """Rebuild the grid and query every bullet, as the game does each tick."""
+    grid.build(aliens)
+    return grid.groupcollide(bullets, False, False)
+
+
+def bounds(group):
+    """Return a row of left, top, right, bottom per sprite in group."""
+    return np.array([(s.rect.left, s.rect.top, s.rect.right, s.rect.bottom)
+                     for s in group], dtype=np.int64).reshape(-1, 4)
+
+
+def run_array_grid(bullet_bounds, alien_bounds):
+    """Pair up overlapping rows of the bounds arrays, as the game's fleet does."""
+    return overlapping_pairs(bullet_bounds, alien_bounds, CELL_SIZE)
+
+
+def pairs_to_hits(rows, columns, bullets, aliens):
+    """Return overlapping_pairs() output as groupcollide's bullet -> aliens sets."""
+    bullets, aliens = bullets.sprites(), aliens.sprites()
+    hits = {}
+    for row, column in zip(rows.tolist(), columns.tolist()):
+        hits.setdefault(bullets[row], set()).add(aliens[column])
+    return hits
+
+
+def run_narrow_phase(grid, bullets, aliens):
+    """The broadphase followed by the game's mask narrow phase."""
+    grid.build(aliens)
+    return grid.groupcollide(bullets, False, False, pygame.sprite.collide_mask)
+
+
+def main():
+    grid = SpatialHash(CELL_SIZE)
+    print(f"{'bullets':>8} {'aliens':>8} {'groupcollide ms':>16} "
+          f"{'spatial hash ms':>16} {'speedup':>8} {'array grid ms':>14} {'speedup':>8}")
+    for bullet_count, alien_count in CASES:
+        bullets, aliens = make_groups(bullet_count, alien_count)
+        bullet_bounds, alien_bounds = bounds(bullets), bounds(aliens)
+
+        # Every path must agree before their timings mean anything.
+        expected = {b: set(hits) for b, hits in run_groupcollide(bullets, aliens).items()}
+        actual = {b: set(hits) for b, hits in run_spatial_hash(grid, bullets, aliens).items()}
+        assert expected == actual, "spatial hash disagrees with groupcollide"
+        actual = pairs_to_hits(*run_array_grid(bullet_bounds, alien_bounds), bullets, aliens)
+        assert expected == actual, "array grid disagrees with groupcollide"
+
+        number = 20
+        brute = min(timeit.repeat(lambda: run_groupcollide(bullets, aliens),
+                                  number=number, repeat=3)) / number
+        hashed = min(timeit.repeat(lambda: run_spatial_hash(grid, bullets, aliens),
+                                   number=number, repeat=3)) / number
+        arrays = min(timeit.repeat(lambda: run_array_grid(bullet_bounds, alien_bounds),
+                                   number=number, repeat=3)) / number
+        print(f"{bullet_count:>8} {alien_count:>8} {brute * 1000:>16.3f} "
+              f"{hashed * 1000:>16.3f} {brute / hashed:>7.1f}x "
+              f"{arrays * 1000:>14.3f} {brute / arrays:>7.1f}x")
+
+    print(f"\n{'bullets':>8} {'aliens':>8} {'rect ms':>9} {'mask ms':>9} "
+          f"{'rect hits':>10} {'mask hits':>10}")
+    for bullet_count, alien_count in CASES:
+        bullets, aliens = make_masked_groups(bullet_count, alien_count)
+        rect_hits = len(run_spatial_hash(grid, bullets, aliens))
+        mask_hits = len(run_narrow_phase(grid, bullets, aliens))
+
+        number = 20
+        rect_only = min(timeit.repeat(lambda: run_spatial_hash(grid, bullets, aliens),
+                                      number=number, repeat=3)) / number
+        masked = min(timeit.repeat(lambda: run_narrow_phase(grid, bullets, aliens),
+                                   number=number, repeat=3)) / number
+        print(f"{bullet_count:>8} {alien_count:>8} {rect_only * 1000:>9.3f} "
+              f"{masked * 1000:>9.3f} {rect_hits:>10} {mask_hits:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,26 @@
-import pygame
-from pygame.sprite import Sprite
+from assets import Assets
+from entities import EntitySprite
 
-class Bullet(Sprite):
-    """A class to manage bullets fired from the ship."""
+class Bullet(EntitySprite):
+    """A class to manage bullets fired from the ship.
+
+    The bullet is an entity of the game's 'bullets' archetype, which the
+    game moves, culls and draws for every bullet at once; this sprite
+    stands in for it in groups and collision tests.
+    """
 
     def __init__(self, ai_game):
-        """Create a bullet object at the ship's current position."""
-        super().__init__()
-        self.screen = ai_game.screen
-        self.color = ai_game.settings.bullet_color
+        """Create a bullet; it joins the game when reset() places it."""
         self.settings = ai_game.settings
+        super().__init__(ai_game.entity_store['bullets'],
+                         (self.settings.bullet_width, self.settings.bullet_height))
+        self.color = self.settings.bullet_color
+        self.ship = ai_game.ship
 
-        self.rect = pygame.Rect(0, 0, self.settings.bullet_width, self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
-        self.y = float(self.rect.y)
-
-    def update(self):
-        """Move the bullet up the screen."""
-        self.y -= self.settings.bullet_speed
-        self.rect.y = self.y
+        self.mask = Assets.solid_mask(self.rect.size)
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def reset(self, ship=None):
+        """Move the bullet to the top of ship, or the player's ship."""
+        self.rect.midtop = (ship or self.ship).rect.midtop
+        self.place(self._rect.topleft, velocity=(0, -1),
+                   collider=self._rect.size, renderable=self.color)
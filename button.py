@@ -1,5 +1,7 @@
 import pygame.font
 
+from assets import Assets
+
 
 class Button:
     """A class to build buttons for the game."""
@@ -13,7 +15,7 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = (0, 135, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = Assets.font(None, 48)
 
         # Build the button's rect object and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -24,12 +26,13 @@ class Button:
 
     def _prep_msg(self, msg):
         """Turn msg into a rendered image and center text on the button."""
-        self.msg_image = self.font.render(msg, True, self.text_color,
-                self.button_color)
+        self.msg_image = Assets.text(self.font, msg, self.text_color,
+                background=self.button_color)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
     def draw_button(self):
         """Draw blank button and then draw message."""
         self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
\ No newline at end of file
+        self.screen.blit(self.msg_image, self.msg_image_rect)
+        return self.rect
\ No newline at end of file
@@ -0,0 +1,342 @@
+import numpy as np
+import pygame
+
+
+# Component name -> (dtype, values per entity)
+COMPONENTS = {
+    'position': (np.float64, 2),        # top-left x, y
+    'prev_position': (np.float64, 2),   # position on the previous tick
+    'velocity': (np.float64, 2),        # per tick, in units of the move() scale
+    'collider': (np.int64, 2),          # width, height
+    'bounds': (np.int64, 4),            # collider's left, top, right, bottom in
+                                        #   whole pixels, kept by move() and place()
+    'renderable': (np.uint8, 3),        # RGB fill color
+}
+
+
+class Archetype:
+    """A class to store every entity of one kind as packed component arrays.
+
+    Each component is one NumPy array with a row per entity. Live entities
+    always fill rows [0, count) in the order they were spawned: despawning
+    shifts the later rows up, so systems work on whole slices, never skip
+    dead rows, and visit entities in the same order as the sprite group
+    they mirror. Entity ids stay valid while rows move, and each row can
+    name an owner, such as the sprite that stands in for the entity.
+    """
+
+    def __init__(self, name, components, capacity=16):
+        """Initialize an empty archetype with the named components."""
+        self.name = name
+        self.components = tuple(components)
+        self.count = 0
+        self.arrays = {component: self._empty(component, capacity)
+                       for component in self.components}
+
+        # Row -> entity id and owner; entity id -> row (-1 when free).
+        self.ids = np.zeros(capacity, np.int64)
+        self.owners = [None] * capacity
+        self.rows = np.full(capacity, -1, np.int64)
+        # A stack of unused ids, the next one on top at free_ids[free_count - 1]
+        self.free_ids = np.arange(capacity - 1, -1, -1)
+        self.free_count = capacity
+
+    @staticmethod
+    def _empty(component, capacity):
+        """Return a zeroed array for capacity entities' component."""
+        dtype, width = COMPONENTS[component]
+        return np.zeros((capacity, width), dtype)
+
+    def __len__(self):
+        """Return the number of live entities."""
+        return self.count
+
+    def __getitem__(self, component):
+        """Return the live rows of component, as a view."""
+        return self.arrays[component][:self.count]
+
+    def spawn(self, owner=None, **values):
+        """Add an entity with the given component values; return its id.
+
+        Components not given are zero.
+        """
+        if self.count == len(self.ids):
+            self._grow()
+        self.free_count -= 1
+        entity = int(self.free_ids[self.free_count])
+        row = self.count
+        self.count += 1
+        self.ids[row] = entity
+        self.rows[entity] = row
+        self.owners[row] = owner
+        for component in self.components:
+            self.arrays[component][row] = values.get(component, 0)
+        return entity
+
+    def despawn(self, entity):
+        """Remove entity, shifting the rows after it up by one."""
+        row = self.rows[entity]
+        last = self.count - 1
+        for array in self.arrays.values():
+            array[row:last] = array[row + 1:self.count]
+        self.ids[row:last] = self.ids[row + 1:self.count]
+        self.rows[self.ids[row:last]] -= 1
+        del self.owners[row]
+        self.owners.append(None)
+        self.rows[entity] = -1
+        self.free_ids[self.free_count] = entity
+        self.free_count += 1
+        self.count = last
+
+    def despawn_many(self, entities):
+        """Remove several entities at once, keeping the rest in order.
+
+        The survivors are compacted with one boolean mask, so removing
+        many entities costs about as much as removing one.
+        """
+        entities = np.asarray(entities, np.int64)
+        count = self.count
+        keep = np.ones(count, bool)
+        keep[self.rows[entities]] = False
+        last = count - len(entities)
+        for array in self.arrays.values():
+            array[:last] = array[:count][keep]
+        self.ids[:last] = self.ids[:count][keep]
+        self.rows[self.ids[:last]] = np.arange(last)
+        self.rows[entities] = -1
+        self.owners[:count] = ([owner for owner, kept in zip(self.owners, keep.tolist()) if kept]
+                               + [None] * len(entities))
+        self.free_ids[self.free_count:self.free_count + len(entities)] = entities
+        self.free_count += len(entities)
+        self.count = last
+
+    def row(self, entity):
+        """Return the row entity's components are in."""
+        return self.rows[entity]
+
+    def _grow(self):
+        """Double the capacity of every array."""
+        old = len(self.ids)
+        capacity = 2 * old
+        for component, array in self.arrays.items():
+            grown = self._empty(component, capacity)
+            grown[:old] = array
+            self.arrays[component] = grown
+        self.ids = np.concatenate((self.ids, np.zeros(old, np.int64)))
+        self.rows = np.concatenate((self.rows, np.full(old, -1, np.int64)))
+        self.owners.extend([None] * old)
+        # Every old id is in use, so only the new ones are free.
+        self.free_ids = np.concatenate((np.arange(capacity - 1, old - 1, -1),
+                                        np.zeros(old, np.int64)))
+        self.free_count = old
+
+
+class EntityStore:
+    """A class to hold a game's archetypes by name."""
+
+    def __init__(self):
+        """Initialize a store with no archetypes."""
+        self.archetypes = {}
+
+    def add(self, name, components, capacity=16):
+        """Create, store and return an archetype."""
+        archetype = Archetype(name, components, capacity)
+        self.archetypes[name] = archetype
+        return archetype
+
+    def __getitem__(self, name):
+        """Return the archetype called name."""
+        return self.archetypes[name]
+
+
+class EntitySprite(pygame.sprite.Sprite):
+    """A class to stand in for one entity where code expects a sprite.
+
+    The entity's components hold its state. rect is placed from the
+    entity's position whenever it's read, so groups, masks and rect tests
+    keep working without a per-tick sync. Killing the sprite despawns the
+    entity and, if the sprite came from a SpritePool, returns it there.
+    """
+
+    def __init__(self, archetype, size):
+        """Initialize a sprite of size for an entity of archetype, not yet spawned."""
+        super().__init__()
+        self.archetype = archetype
+        self.entity = None
+        self.pool = None
+        self._rect = pygame.Rect((0, 0), size)
+
+    @property
+    def rect(self):
+        """Return the sprite's rect, placed where its entity is."""
+        if self.entity is not None:
+            row = self.archetype.rows[self.entity]
+            self._rect.topleft = self.archetype.arrays['bounds'][row, :2].tolist()
+        return self._rect
+
+    @property
+    def x(self):
+        """Return the entity's exact horizontal position."""
+        return self.archetype.arrays['position'][self.archetype.rows[self.entity], 0]
+
+    @x.setter
+    def x(self, x):
+        row = self.archetype.rows[self.entity]
+        self.archetype.arrays['position'][row, 0] = x
+        fit_bounds(self.archetype, row)
+
+    @property
+    def y(self):
+        """Return the entity's exact vertical position."""
+        return self.archetype.arrays['position'][self.archetype.rows[self.entity], 1]
+
+    @y.setter
+    def y(self, y):
+        row = self.archetype.rows[self.entity]
+        self.archetype.arrays['position'][row, 1] = y
+        fit_bounds(self.archetype, row)
+
+    @property
+    def prev_y(self):
+        """Return the entity's vertical position on the previous tick."""
+        return self.archetype.arrays['prev_position'][self.archetype.rows[self.entity], 1]
+
+    @prev_y.setter
+    def prev_y(self, y):
+        self.archetype.arrays['prev_position'][self.archetype.rows[self.entity], 1] = y
+
+    def place(self, topleft, **components):
+        """Spawn the entity with components if it isn't yet, and put it at topleft.
+
+        topleft is in whole pixels, like a rect's.
+        """
+        if self.entity is None:
+            self.entity = self.archetype.spawn(self, **components)
+        row = self.archetype.rows[self.entity]
+        arrays = self.archetype.arrays
+        arrays['position'][row] = topleft
+        arrays['prev_position'][row] = topleft
+        x, y = topleft
+        width, height = arrays['collider'][row].tolist()
+        arrays['bounds'][row] = (x, y, x + width, y + height)
+
+    def kill(self):
+        """Remove the sprite from its groups, despawn its entity, and return it to its pool."""
+        if self.alive():
+            self.archetype.despawn(self.entity)
+            self._retire()
+
+    @staticmethod
+    def kill_all(sprites):
+        """Kill sprites, despawning each archetype's entities in one batch."""
+        by_archetype = {}
+        for sprite in sprites:
+            if sprite.alive():
+                by_archetype.setdefault(sprite.archetype, []).append(sprite)
+        for archetype, dying in by_archetype.items():
+            archetype.despawn_many([sprite.entity for sprite in dying])
+            for sprite in dying:
+                sprite._retire()
+
+    def _retire(self):
+        """Leave the sprite's groups and return it to its pool, once its entity is gone."""
+        super().kill()
+        self.entity = None
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+def pixels(values):
+    """Round values to whole pixels the way pygame Rects do, half away from zero."""
+    return (values + np.copysign(0.5, values)).astype(np.int64)
+
+
+# Systems: each runs over every live entity of an archetype at once with a
+#   fixed handful of array operations, so the cost per entity is tiny and
+#   entity counts can grow far past what per-sprite updates allow.
+
+def fit_bounds(archetype, rows=slice(None)):
+    """Recompute the bounds of the entities in rows from their positions.
+
+    Positions are rounded like pygame Rects, so bounds match the owners'
+    rects.
+    """
+    live = slice(0, archetype.count)
+    corner = pixels(archetype.arrays['position'][live][rows])
+    bounds = archetype.arrays['bounds'][live]
+    bounds[rows, :2] = corner
+    bounds[rows, 2:] = corner + archetype.arrays['collider'][live][rows]
+
+
+def move(archetype, scale):
+    """Remember positions for interpolation, then add velocity * scale."""
+    if not archetype.count:
+        return
+    position = archetype['position']
+    archetype['prev_position'][:] = position
+    position += archetype['velocity'] * scale
+    fit_bounds(archetype)
+
+
+def outside(archetype, width, height):
+    """Return the owners of entities wholly off a width x height screen."""
+    if not archetype.count:
+        return []
+    bounds = archetype['bounds']
+    off = (bounds[:, 2:] <= 0) | (bounds[:, :2] >= (width, height))
+    if not off.any():
+        return []
+    return [archetype.owners[row] for row in off.any(axis=1).nonzero()[0].tolist()]
+
+
+def _overlap(archetype, rect):
+    """Return which entities' bounds overlap rect, as a bool per row."""
+    bounds = archetype['bounds']
+    return ((bounds[:, 0] < rect.right) & (bounds[:, 2] > rect.left)
+            & (bounds[:, 1] < rect.bottom) & (bounds[:, 3] > rect.top))
+
+
+def overlapping(archetype, rect):
+    """Return the owners of entities whose colliders overlap rect, in row order."""
+    if not archetype.count:
+        return []
+    hit = _overlap(archetype, rect)
+    return [archetype.owners[row] for row in hit.nonzero()[0].tolist()]
+
+
+def in_circle(archetype, rect, radius):
+    """Return the owners of entities overlapping a circle, in row order.
+
+    The circle has radius and sits at the center of rect; entities must
+    overlap rect too, as with a round sprite's rect and collision circle.
+    """
+    if not archetype.count:
+        return []
+    rows = _overlap(archetype, rect).nonzero()[0]
+    if not len(rows):
+        return []
+    bounds = archetype['bounds'][rows]
+    center_x, center_y = rect.center
+    # The nearest pixel of each collider to the center
+    nearest_x = np.minimum(np.maximum(bounds[:, 0], center_x), bounds[:, 2] - 1) - center_x
+    nearest_y = np.minimum(np.maximum(bounds[:, 1], center_y), bounds[:, 3] - 1) - center_y
+    hit = nearest_x * nearest_x + nearest_y * nearest_y <= radius * radius
+    return [archetype.owners[row] for row in rows[hit].tolist()]
+
+
+def draw_rects(archetype, surface, alpha=1.0):
+    """Fill each entity's collider rect, alpha of the way between ticks.
+
+    Return the rects drawn.
+    """
+    if not archetype.count:
+        return []
+    previous = archetype['prev_position']
+    position = pixels(previous + (archetype['position'] - previous) * alpha)
+    # draw.rect, since Surface.fill shifts rects that start above the top
+    #   edge down instead of clipping them.
+    draw = pygame.draw.rect
+    return [draw(surface, color, (x, y, width, height))
+            for (x, y), (width, height), color in zip(
+                position.tolist(), archetype['collider'].tolist(),
+                archetype['renderable'].tolist())]
@@ -0,0 +1,204 @@
+"""A Gym-style reinforcement-learning interface to Alien Invasion.
+
+    env = AlienInvasionEnv(seed=0)
+    observation, info = env.reset()
+    observation, reward, terminated, truncated, info = env.step(RIGHT_FIRE)
+
+The API follows Gymnasium's reset/step conventions without depending on
+it. Observations are written into buffers owned by the environment and
+returned without copying, so they're only valid until the next step();
+copy them to keep them.
+"""
+import numpy as np
+
+from main import AlienInvasion
+
+
+# Discrete actions
+NOOP, LEFT, RIGHT, FIRE, LEFT_FIRE, RIGHT_FIRE, SHIELD = range(7)
+ACTION_COUNT = 7
+_MOVES = {LEFT: (True, False), RIGHT: (False, True),
+          LEFT_FIRE: (True, False), RIGHT_FIRE: (False, True)}
+_FIRES = {FIRE, LEFT_FIRE, RIGHT_FIRE}
+
+
+class AlienInvasionEnv:
+    """A class to drive one headless game one action at a time.
+
+    observation='features' gives a flat float32 array: ship x, shield
+    active, shield cooldown left, then (x, y, alive) for up to max_aliens
+    aliens and (x, y, present) for up to max_bullets alien and player
+    bullets each, with positions scaled to 0..1. 'pixels' gives a zero-copy
+    (height, width, 3) RGB view of the screen and 'pixels2d' a (height,
+    width) view of packed 0xAARRGGBB pixels.
+
+    The pixel views read the NumPy buffer behind the headless screen
+    rather than pygame.surfarray.pixels3d/pixels2d: a surfarray view locks
+    its surface, so a caller still holding the last observation would
+    stop the next frame from being drawn.
+    """
+
+    def __init__(self, observation='features', frame_skip=1, max_ticks=60 * 60 * 10,
+                 max_aliens=64, max_bullets=16, seed=None, out=None):
+        """Create the game; out may be a preallocated features row to fill."""
+        if observation not in ('features', 'pixels', 'pixels2d'):
+            raise ValueError(f"unknown observation type {observation!r}")
+        self.observation_type = observation
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.max_aliens = max_aliens
+        self.max_bullets = max_bullets
+        self.action_count = ACTION_COUNT
+        self.seed = seed
+
+        self.game = None
+        self.observation_size = 3 + 3 * max_aliens + 6 * max_bullets
+        self.features = out if out is not None else np.zeros(self.observation_size, np.float32)
+
+    def reset(self, seed=None):
+        """Start a new game and return (observation, info)."""
+        if seed is None:
+            seed = self.seed
+            # Later resets get fresh games that are still reproducible.
+            self.seed = None if seed is None else seed + 1
+        self.game = AlienInvasion(headless=True, seed=seed)
+        self.game.start_game()
+        self.start_tick = self.game.ticks
+        return self._observe(), self._info()
+
+    def step(self, action):
+        """Apply action for frame_skip ticks.
+
+        Return (observation, reward, terminated, truncated, info); the
+        reward is the score gained.
+        """
+        game = self.game
+        ship = game.ship
+        ship.moving_left, ship.moving_right = _MOVES.get(action, (False, False))
+        if action == SHIELD:
+            game._activate_shield_skill()
+
+        score = game.stats.score
+        for _ in range(self.frame_skip):
+            if action in _FIRES:
+                game._fire_bullet()
+            game.step()
+            if not game.game_active:
+                break
+
+        reward = float(game.stats.score - score)
+        terminated = not game.game_active
+        truncated = not terminated and game.ticks - self.start_tick >= self.max_ticks
+        return self._observe(), reward, terminated, truncated, self._info()
+
+    def close(self):
+        """Release the game."""
+        self.game = None
+
+    def _info(self):
+        """Return the auxiliary info dict."""
+        stats = self.game.stats
+        return {'score': stats.score, 'level': stats.level,
+                'ships_left': stats.ships_left, 'ticks': self.game.ticks}
+
+    def _observe(self):
+        """Return the observation of the current game state."""
+        if self.observation_type == 'features':
+            self._write_features()
+            return self.features
+
+        game = self.game
+        game.screen.fill(game.settings.bg_color)
+        game._draw_frame()
+        if self.observation_type == 'pixels':
+            # The buffer is BGRA; reverse the color bytes without copying.
+            return game.screen_pixels[:, :, 2::-1]
+        return game.screen_pixels.view(np.uint32)[:, :, 0]
+
+    def _write_features(self):
+        """Fill the features buffer in place."""
+        game = self.game
+        settings = game.settings
+        width, height = settings.screen_width, settings.screen_height
+        features = self.features
+        features[:] = 0
+
+        features[0] = game.ship.x / width
+        features[1] = game.shield_active
+        cooldown = settings.shield_cooldown - (game.sim_time - game.shield_last_used)
+        features[2] = max(0, cooldown) / settings.shield_cooldown
+
+        fleet = game.fleet
+        alive = np.flatnonzero(fleet.alive)[:self.max_aliens]
+        aliens = features[3:3 + 3 * self.max_aliens].reshape(self.max_aliens, 3)
+        aliens[:len(alive), 0] = fleet.x[alive] / width
+        aliens[:len(alive), 1] = fleet.y[alive] / height
+        aliens[:len(alive), 2] = 1
+
+        start = 3 + 3 * self.max_aliens
+        for group in (game.alien_bullets, game.bullets):
+            bullets = features[start:start + 3 * self.max_bullets].reshape(self.max_bullets, 3)
+            for row, bullet in zip(bullets, group):
+                row[0] = bullet.rect.centerx / width
+                row[1] = bullet.y / height
+                row[2] = 1
+            start += 3 * self.max_bullets
+
+
+class VectorAlienInvasionEnv:
+    """A class to advance num_envs games in lockstep.
+
+    With feature observations every game writes straight into its row of
+    one (num_envs, observation_size) array, which step() returns without
+    copying. Pixel observations come back as a list of per-game views.
+    Finished games are reset automatically, Gymnasium-style; their final
+    info is kept under 'final_info'.
+    """
+
+    def __init__(self, num_envs, seed=0, **kwargs):
+        """Create num_envs environments seeded seed, seed + 1, ..."""
+        self.num_envs = num_envs
+        probe = AlienInvasionEnv(**kwargs)
+        self.observation_type = probe.observation_type
+        self.observations = np.zeros((num_envs, probe.observation_size), np.float32)
+        self.envs = [AlienInvasionEnv(seed=seed + i * 100003, out=self.observations[i], **kwargs)
+                     for i in range(num_envs)]
+        self.rewards = np.zeros(num_envs, np.float32)
+        self.terminated = np.zeros(num_envs, bool)
+        self.truncated = np.zeros(num_envs, bool)
+
+    def reset(self):
+        """Reset every game and return (observations, infos)."""
+        results = [env.reset() for env in self.envs]
+        return self._gather([obs for obs, _ in results]), [info for _, info in results]
+
+    def step(self, actions):
+        """Step every game with its action.
+
+        Return (observations, rewards, terminated, truncated, infos).
+        """
+        observations, infos = [], []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, reward, terminated, truncated, info = env.step(int(action))
+            if terminated or truncated:
+                obs, reset_info = env.reset()
+                reset_info['final_info'] = info
+                info = reset_info
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            observations.append(obs)
+            infos.append(info)
+        return (self._gather(observations), self.rewards, self.terminated,
+                self.truncated, infos)
+
+    def close(self):
+        """Close every game."""
+        for env in self.envs:
+            env.close()
+
+    def _gather(self, observations):
+        """Return the batch of observations."""
+        if self.observation_type == 'features':
+            return self.observations
+        return observations
@@ -0,0 +1,342 @@
+import numpy as np
+import pygame
+
+from alien import Alien
+from spatial_hash import overlapping_pairs
+
+
+class FleetTemplate:
+    """A class to hold a formation's positions and fire-scheduler indexes.
+
+    Building one sorts the formation into rows and columns. Fleets spawned
+    from the same template only copy its arrays, so that work happens once
+    per formation instead of once per level.
+    """
+
+    def __init__(self, positions):
+        """Index the formation with one alien at each (x, y) position."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.x = positions[:, 0].copy()
+        self.y = positions[:, 1].copy()
+
+        # Group slots into columns and rows for the fire scheduler.
+        columns, self.column = np.unique(self.x, return_inverse=True)
+        rows, self.row = np.unique(self.y, return_inverse=True)
+        self.row_y = rows.astype(float)
+        self.row_alive = np.bincount(self.row, minlength=len(rows))
+
+        # Each column's slots from the bottom up; the first is its shooter.
+        order = np.lexsort((-self.y, self.column))
+        starts = np.searchsorted(self.column[order], np.arange(len(columns) + 1))
+        self.column_slots = [order[starts[i]:starts[i + 1]].tolist()
+                             for i in range(len(columns))]
+        self.column_bottom = np.array([slots[0] for slots in self.column_slots],
+                                      dtype=np.int64)
+
+    def __len__(self):
+        """Return the number of slots in the formation."""
+        return len(self.x)
+
+
+class Fleet:
+    """A class to update the whole alien fleet as contiguous NumPy arrays.
+
+    Positions, alive flags and firing state live in parallel arrays indexed
+    by slot, so movement, edge, drop and bottom checks are one vectorized
+    operation per frame, and drawing and collisions read the arrays too.
+    Each slot has a thin Alien sprite in self.aliens whose membership
+    tracks the slot: killing the sprite kills the alien.
+
+    Firing is scheduled for the fleet as a whole: each tick samples how
+    many regular shots fire, then picks that many shooters from the lowest
+    living alien of each column. Per-row alive counts and per-column
+    bottom slots are kept up to date as aliens die, so firing costs depend
+    on the shots fired rather than the fleet size.
+
+    Level changes spawn from a FleetTemplate cached per screen and alien
+    size, and reuse the Alien sprites of earlier fleets, so a new level
+    doesn't cost a frame-time spike.
+    """
+
+    # Standard formations by (screen width, screen height, alien size)
+    templates = {}
+
+    def __init__(self, ai_game):
+        """Initialize an empty fleet with sprites for a full formation."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.rng = np.random.default_rng([ai_game.seed, 1])
+
+        self.aliens = pygame.sprite.Group()
+        self.sprites = []
+        self.template = None
+        self._allocate(0)
+
+        # Every alien shares one image, so one size and mask serve the whole fleet.
+        alien = Alien(ai_game)
+        self.alien_width, self.alien_height = alien.rect.size
+        self.alien_mask = alien.mask
+
+        # Build the first fleet's sprites now rather than on the first level.
+        self._prewarm(len(self.formation()))
+
+    def _allocate(self, size):
+        """Create fresh state arrays for size slots."""
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.prev_x = np.zeros(size)
+        self.prev_y = np.zeros(size)
+        self.alive = np.zeros(size, dtype=bool)
+        self.burst_count = np.zeros(size, dtype=np.int32)
+        self.burst_timer = np.zeros(size, dtype=np.int64)
+        self.last_shot_time = np.zeros(size, dtype=np.int64)
+        self.alive_count = 0
+
+        # Formation bookkeeping for the fire scheduler
+        self.column = np.zeros(size, dtype=np.int64)
+        self.row = np.zeros(size, dtype=np.int64)
+        self.column_slots = []
+        self.column_bottom = np.zeros(0, dtype=np.int64)
+        self.row_y = np.zeros(0)
+        self.row_alive = np.zeros(0, dtype=np.int64)
+        self.bursting = set()
+
+    def __len__(self):
+        """Return the number of aliens still alive."""
+        return self.alive_count
+
+    def formation(self):
+        """Return the cached template for the standard formation.
+
+        Aliens fill the screen spaced one alien width and one alien height
+        apart, leaving room for the ship below.
+        """
+        screen_width = self.settings.screen_width
+        screen_height = self.settings.screen_height
+        key = (screen_width, screen_height, self.alien_width, self.alien_height)
+        template = self.templates.get(key)
+        if template is None:
+            columns = np.arange(self.alien_width, screen_width - 2 * self.alien_width,
+                                2 * self.alien_width)
+            rows = np.arange(self.alien_height, screen_height - 3 * self.alien_height,
+                             2 * self.alien_height)
+            x, y = np.meshgrid(columns, rows)
+            template = FleetTemplate(np.column_stack((x.ravel(), y.ravel())))
+            self.templates[key] = template
+        return template
+
+    def spawn(self, formation):
+        """Replace the fleet with a FleetTemplate or a list of (x, y) positions."""
+        if not isinstance(formation, FleetTemplate):
+            formation = FleetTemplate(formation)
+        size = len(formation)
+        self.clear()
+        self._allocate(size)
+        self.template = formation
+        self.x[:] = formation.x
+        self.y[:] = formation.y
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        self.alive[:] = True
+        self.alive_count = size
+
+        # The template's indexes are shared; only what kills change is copied.
+        self.column[:] = formation.column
+        self.row[:] = formation.row
+        self.column_slots = formation.column_slots
+        self.column_bottom = formation.column_bottom.copy()
+        self.row_y = formation.row_y.copy()
+        self.row_alive = formation.row_alive.copy()
+
+        self._prewarm(size)
+        self.aliens.add(self.sprites[:size])
+
+    def offset(self):
+        """Return how far the fleet has moved from its template, as (dx, dy).
+
+        Every alien moves and drops together, so this one offset places
+        the whole fleet.
+        """
+        if not len(self.x):
+            return 0.0, 0.0
+        return (float(self.x[0] - self.template.x[0]),
+                float(self.y[0] - self.template.y[0]))
+
+    def place(self, template, dx, dy, alive):
+        """Show the fleet at an offset from template with the given alive flags.
+
+        This mirrors a fleet simulated elsewhere, so the fire scheduler's
+        state is left alone.
+        """
+        if self.template is not template:
+            self.spawn(template)
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        self.x[:] = template.x + dx
+        self.y[:] = template.y + dy
+        self.alive[:] = alive
+        self.alive_count = int(np.count_nonzero(alive))
+
+    def _prewarm(self, size):
+        """Make sure there are Alien sprites for at least size slots.
+
+        Sprites are views of a slot index, so they're kept and reused by
+        every later fleet.
+        """
+        self.sprites.extend(Alien(self.ai_game, self, i)
+                            for i in range(len(self.sprites), size))
+
+    def clear(self):
+        """Remove every alien."""
+        self.aliens.empty()
+        self.alive[:] = False
+        self.alive_count = 0
+        self.row_alive[:] = 0
+        self.column_bottom[:] = -1
+        self.bursting.clear()
+
+    def kill(self, index):
+        """Mark the alien in slot index as dead."""
+        if not self.alive[index]:
+            return
+        self.alive[index] = False
+        self.alive_count -= 1
+        self.row_alive[self.row[index]] -= 1
+        self.bursting.discard(index)
+
+        # Hand the column's fire to the next living alien above.
+        column = self.column[index]
+        if self.column_bottom[column] == index:
+            self.column_bottom[column] = next(
+                (slot for slot in self.column_slots[column] if self.alive[slot]), -1)
+
+    def update(self):
+        """Drop at the edges, then move and fire the whole fleet."""
+        if not self.alive_count:
+            return
+
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        if self.check_edges():
+            self.change_direction()
+
+        self.x += (self.settings.alien_speed * self.settings.fleet_direction
+                   * self.settings.tick_scale)
+        self._fire()
+
+    def check_edges(self):
+        """Return True if any living alien is at a screen edge."""
+        left = self.x[self.alive].astype(int)
+        screen_right = self.screen.get_rect().right
+        return bool(((left + self.alien_width >= screen_right) | (left <= 0)).any())
+
+    def change_direction(self):
+        """Drop the entire fleet and change the fleet's direction."""
+        self.y += self.settings.fleet_drop_speed
+        self.row_y += self.settings.fleet_drop_speed
+        self.settings.fleet_direction *= -1
+
+    def reached_bottom(self):
+        """Return True if any living alien has reached the bottom of the screen."""
+        bottom = self.y[self.alive] + self.alien_height
+        return bool((bottom >= self.settings.screen_height).any())
+
+    def collides_with(self, rect, mask=None):
+        """Return True if any living alien overlaps rect.
+
+        With the mask of the sprite at rect, aliens whose rects overlap it
+        are then checked pixel by pixel.
+        """
+        bounds = np.array([[rect.left, rect.top, rect.right, rect.bottom]])
+        return bool(self.hits(bounds, mask))
+
+    def hits(self, bounds, mask=None):
+        """Return the living aliens hit by each of a batch of rects.
+
+        bounds has a row of left, top, right, bottom per rect. A grid
+        broadphase over the arrays finds the rects and aliens that overlap;
+        those pairs are then checked with mask, the one mask all the rects
+        share, when given. Rows are taken in order and each alien counts
+        only for the first row to hit it, as when a volley of bullets each
+        kill what they touch. Return a dict mapping rows that hit to lists
+        of alien slots.
+        """
+        slots = self.alive.nonzero()[0]
+        # Whole-pixel alien bounds, truncated like the drawn positions
+        aliens = np.empty((len(slots), 4), np.int64)
+        aliens[:, 0] = self.x[slots]
+        aliens[:, 1] = self.y[slots]
+        aliens[:, 2:] = aliens[:, :2] + (self.alien_width, self.alien_height)
+        left, top = aliens[:, 0], aliens[:, 1]
+        rows, columns = overlapping_pairs(bounds, aliens, self.settings.collision_cell_size)
+        hits = {}
+        taken = set()
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            slot = int(slots[column])
+            if slot in taken:
+                continue
+            x, y = int(left[column]), int(top[column])
+            if mask is None or self.alien_mask.overlap(
+                    mask, (int(bounds[row, 0]) - x, int(bounds[row, 1]) - y)):
+                hits.setdefault(row, []).append(slot)
+                taken.add(slot)
+        return hits
+
+    def draw(self, surface, alpha=1.0):
+        """Draw living aliens alpha of the way from their last tick to this one."""
+        alive = np.flatnonzero(self.alive)
+        x = self.prev_x[alive] + (self.x[alive] - self.prev_x[alive]) * alpha
+        y = self.prev_y[alive] + (self.y[alive] - self.prev_y[alive]) * alpha
+        image = self.sprites[0].image if self.sprites else None
+        return surface.blits([(image, position) for position in
+                              zip(x.astype(int).tolist(), y.astype(int).tolist())])
+
+    def _fire(self):
+        """Continue bursts, then fire this tick's scheduled regular shots."""
+        current_time = self.ai_game.sim_time
+
+        # Burst shots follow 200ms apart.
+        for index in list(self.bursting):
+            if current_time - self.burst_timer[index] > 200:
+                self._fire_bullet(index)
+                self.burst_count[index] -= 1
+                self.burst_timer[index] = current_time
+                if self.burst_count[index] <= 0:
+                    self.bursting.discard(index)
+
+        # Each living alien would fire with alien_fire_rate per 1/60 s, and
+        #   twice that in the bottom rows; sample how many of them do.
+        fire_chance = self.settings.alien_fire_rate * self.settings.tick_scale
+        low = self.row_y + self.alien_height > self.screen.get_rect().height * 0.7
+        low_count = int(self.row_alive[low].sum())
+        high_count = self.alive_count - low_count
+        shots = (self.rng.binomial(high_count, min(1.0, fire_chance))
+                 + self.rng.binomial(low_count, min(1.0, 2 * fire_chance)))
+        if not shots:
+            return
+
+        # Shots come from the lowest living alien in randomly chosen columns,
+        #   skipping aliens busy with a burst.
+        shooters = [index for index in self.column_bottom.tolist()
+                    if index >= 0 and index not in self.bursting]
+        shots = min(shots, len(shooters))
+        if not shots:
+            return
+        for index in self.rng.choice(shooters, shots, replace=False).tolist():
+            if len(self.ai_game.alien_bullets) < self.settings.alien_bullets_allowed:
+                # 30% chance for burst fire (3 shots)
+                if self.rng.random() < 0.3:
+                    self.burst_count[index] = 2  # 1 now + 2 in burst
+                    self.burst_timer[index] = current_time
+                    self.bursting.add(index)
+
+                self._fire_bullet(index)
+                self.last_shot_time[index] = current_time
+
+    def _fire_bullet(self, index):
+        """Fire a single bullet from the alien in slot index."""
+        shooter = pygame.Rect(int(self.x[index]), int(self.y[index]),
+                              self.alien_width, self.alien_height)
+        bullet = self.ai_game.alien_bullet_pool.acquire(shooter)
+        self.ai_game.alien_bullets.add(bullet)
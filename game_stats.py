@@ -1,4 +1,4 @@
-import json
+from highscores import Leaderboard, load_high_score
 
 class GameStats:
     """Track statistics for Alien Invasion."""
@@ -10,12 +10,14 @@ class GameStats:
         self.game_active = False
         self.ships_left = self.settings.ship_limit
 
-        # Load high score from a file
-        try:
-            with open('high_score.json', 'r') as f:
-                self.high_score = json.load(f)
-        except FileNotFoundError:
-            self.high_score = 0
+        # Load the high score from its file and the leaderboard. Headless
+        #   simulations never record games, so they leave the database alone.
+        self.high_score = load_high_score(self.settings.high_score_path)
+        if ai_game.headless:
+            self.leaderboard = None
+        else:
+            self.leaderboard = Leaderboard(self.settings.leaderboard_path)
+            self.high_score = max(self.high_score, self.leaderboard.best())
 
     def reset_stats(self):
         """Initialize statistics that change during the game."""
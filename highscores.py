@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+def load_high_score(path):
+    """Return the high score stored at path, or 0 if there isn't one."""
+    try:
+        with open(path, 'r') as f:
+            return int(json.load(f))
+    except (FileNotFoundError, ValueError, TypeError):
+        return 0
+
+
+def write_atomic(path, data):
+    """Write data to path through a temporary file and os.replace().
+
+    Readers, and a crash mid-write, only ever see the old or new file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class HighScoreWriter:
+    """A class to persist the high score and finished games off the game loop.
+
+    save() only records the newest score; a daemon thread writes it once no
+    new score has arrived for `delay` seconds, so a burst of kills costs one
+    write. Finished games are added to the leaderboard on the same thread.
+    A write that fails, such as on a database another session keeps
+    locked, is logged and kept queued to retry after `retry_delay` seconds.
+    Once closed, it stops retrying after `close_attempts` tries or when the
+    next retry would start more than `close_timeout` seconds after close().
+    """
+
+    # Seconds between retries of a failed write, and the limits once closed
+    retry_delay = 2.0
+    close_attempts = 3
+    close_timeout = 5.0
+
+    def __init__(self, path, leaderboard=None, delay=1.0):
+        """Start the writer thread for the high score file at path."""
+        self.path = path
+        self.leaderboard = leaderboard
+        self.delay = delay
+
+        self.pending_score = None
+        self.pending_games = []
+        self.last_change = 0.0
+        self.retry_at = 0.0
+        self.close_by = 0.0
+        self.closed = False
+        self.unsaved = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='high-score-writer', daemon=True)
+        self.thread.start()
+
+    def save(self, score):
+        """Queue score to be written once the score stops changing."""
+        with self.condition:
+            self.pending_score = score
+            self.last_change = time.monotonic()
+            self.condition.notify()
+
+    def record_game(self, score, level):
+        """Queue a finished game for the leaderboard and write it promptly."""
+        with self.condition:
+            self.pending_games.append((score, level, time.time()))
+            self.condition.notify()
+
+    def close(self):
+        """Stop the writer thread after it writes everything queued.
+
+        Return False if some of it still couldn't be written.
+        """
+        with self.condition:
+            self.closed = True
+            self.close_by = time.monotonic() + self.close_timeout
+            self.condition.notify()
+        self.thread.join()
+        return not self.unsaved
+
+    def _run(self):
+        """Wait for queued work, debounce scores, and write them."""
+        failures = 0
+        while True:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+                    if self.closed or self.pending_games:
+                        # Write these now, but still wait out a failed write.
+                        due = self.retry_at
+                    elif self.pending_score is not None:
+                        due = max(self.last_change + self.delay, self.retry_at)
+                    else:
+                        self.condition.wait()
+                        continue
+                    if due <= now:
+                        break
+                    self.condition.wait(due - now)
+                score, self.pending_score = self.pending_score, None
+                games, self.pending_games = self.pending_games, []
+                closed = self.closed
+
+            score, games = self._write(score, games)
+            if score is None and not games:
+                failures = 0
+            else:
+                failures += 1
+                with self.condition:
+                    # A newer score replaces the failed one; games keep their order.
+                    if self.pending_score is None:
+                        self.pending_score = score
+                    self.pending_games[:0] = games
+                    self.retry_at = time.monotonic() + self.retry_delay
+
+            if closed and (not failures or failures >= self.close_attempts
+                           or self.retry_at > self.close_by):
+                if failures:
+                    log.error("Giving up; high score %s and %d finished games weren't saved",
+                              self.pending_score, len(self.pending_games))
+                    self.unsaved = True
+                return
+
+    def _write(self, score, games):
+        """Store games in the leaderboard and score in the high score file.
+
+        Return the (score, games) that couldn't be written, to retry later.
+        """
+        if games and self.leaderboard:
+            try:
+                self.leaderboard.add_games(games)
+                games = []
+            except sqlite3.Error as error:
+                log.warning("Couldn't add %d games to the leaderboard: %s", len(games), error)
+        else:
+            games = []
+        if score is not None:
+            try:
+                # Another session may have set a better record meanwhile.
+                if score > load_high_score(self.path):
+                    write_atomic(self.path, json.dumps(score))
+                score = None
+            except OSError as error:
+                log.warning("Couldn't save the high score to %s: %s", self.path, error)
+        return score, games
+
+
+class Leaderboard:
+    """A class to store finished games in a local SQLite database.
+
+    The database runs in WAL mode with a busy timeout, so several game
+    sessions can add scores and read the table at the same time.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        """Remember where the database lives; it's created on first write."""
+        self.path = path
+        self.timeout = timeout
+
+    def _connect(self):
+        """Open a connection, creating the schema if needed."""
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " id INTEGER PRIMARY KEY,"
+            " score INTEGER NOT NULL,"
+            " level INTEGER NOT NULL,"
+            " played_at REAL NOT NULL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC)")
+        return connection
+
+    def add_games(self, games):
+        """Add (score, level, played_at) rows in one transaction."""
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO scores (score, level, played_at) VALUES (?, ?, ?)", games)
+        finally:
+            connection.close()
+
+    def top(self, n=10):
+        """Return the n best games as (score, level, played_at) tuples.
+
+        A database that can't be read, such as a corrupt file, counts as
+        empty so the game still starts.
+        """
+        if not os.path.exists(self.path):
+            return []
+        try:
+            connection = self._connect()
+            try:
+                return connection.execute(
+                    "SELECT score, level, played_at FROM scores"
+                    " ORDER BY score DESC, played_at LIMIT ?", (n,)).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error as error:
+            log.warning("Couldn't read the leaderboard at %s: %s", self.path, error)
+            return []
+
+    def best(self):
+        """Return the best score recorded, or 0."""
+        top = self.top(1)
+        return top[0][0] if top else 0
@@ -1,58 +1,149 @@
+import argparse
+import os
+import secrets
 import sys
-from time import sleep
-import random
+from time import sleep, perf_counter
 
-import json
+# Start-up is timed from here, before the heavy imports below.
+LAUNCH_TIME = perf_counter()
 
+import numpy as np
 import pygame
 
 from settings import Settings
+from assets import Assets
 from game_stats import GameStats
+from highscores import HighScoreWriter
 from scoreboard import Scoreboard
 from button import Button
 from ship import Ship
 from bullet import Bullet
-from alien import Alien
+from fleet import Fleet
 from alien_bullet import AlienBullet
 from shield import Shield
+from pool import SpritePool
+import entities
+from particles import ParticleSystem
+from renderer import DirtyRectRenderer, ScaledPresenter
+from profiler import FrameProfiler
+from audio import AudioManager
+
+
+SHOOT_SOUND = 'sounds/shoot.wav'
+EXPLOSION_SOUND = 'sounds/explosion.wav'
 
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior."""
 
-    def __init__(self):
-        """Initialize the game, and create game resources."""
-        pygame.init()
-        pygame.mixer.init()
-
-        # Load sounds with error handling
-        try:
-            self.shoot_sound = pygame.mixer.Sound('sounds/shoot.wav')
-            self.explosion_sound = pygame.mixer.Sound('sounds/explosion.wav')
-        except (pygame.error, FileNotFoundError):
-            # Create dummy sound objects if files don't exist
-            self.shoot_sound = None
-            self.explosion_sound = None
+    def __init__(self, headless=False, seed=None, settings=None):
+        """Initialize the game, and create game resources.
+
+        With headless=True the game runs on SDL's dummy video and audio
+        drivers, so it can be stepped without a window via step(). Every
+        random stream is derived from seed, so a seed plus the same
+        tick-stamped input replays the same game. settings replaces the
+        default Settings, e.g. for an arena or a scaled window.
+        """
+        self.init_start = perf_counter()
+        self.first_frame_ms = None
+        self.presenter = None
+        self.headless = headless
+        self.seed = seed if seed is not None else secrets.randbits(32)
+        self.recorder = None
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+            # Keep SIGINT/SIGTERM working for batch and replay tools.
+            os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+
+        # Only the display and fonts are needed for the first frame. The
+        #   mixer, sounds and sprite images load on a background thread
+        #   while the window opens. Headless games never play sounds.
+        pygame.display.init()
+        pygame.font.init()
+        Assets.load_in_background(images=['images/ship.bmp', 'images/alien.bmp'],
+                                  sounds=[] if headless else [SHOOT_SOUND, EXPLOSION_SOUND])
             
         self.alien_bullets = pygame.sprite.Group()  # new bullets for aliens
 
         self.clock = pygame.time.Clock()
-        self.settings = Settings()
-
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
-        pygame.display.set_caption("Alien Invasion")
+        self.settings = settings or Settings()
+
+        # Simulation clock: ticks stepped so far and the matching time in ms.
+        self.ticks = 0
+        self.sim_time = 0
+
+        screen_size = (self.settings.screen_width, self.settings.screen_height)
+        if headless:
+            # Each headless game draws to its own surface, so several can
+            #   share a process; a tiny display mode lets images convert().
+            #   The surface is backed by a NumPy array, so its pixels can be
+            #   read without copying or locking it. BGRA matches the layout
+            #   of converted images and text, which keeps blits on pygame's
+            #   fast path.
+            if pygame.display.get_surface() is None:
+                pygame.display.set_mode((1, 1))
+            self.screen_pixels = np.zeros(
+                (self.settings.screen_height, self.settings.screen_width, 4), np.uint8)
+            self.screen = pygame.image.frombuffer(self.screen_pixels, screen_size, 'BGRA')
+        else:
+            window_size = self._window_size(screen_size)
+            if window_size == screen_size:
+                self.screen = pygame.display.set_mode(screen_size)
+            else:
+                # Draw the playfield offscreen and scale it to the window.
+                window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+                self.screen = pygame.Surface(screen_size).convert()
+                self.presenter = ScaledPresenter(self.screen, window, self.settings.scaler)
+            pygame.display.set_caption("Alien Invasion")
+
+        # Render as often as the display refreshes unless a rate was chosen.
+        if self.settings.max_fps is None:
+            self.settings.max_fps = 60 if headless else self._refresh_rate()
 
         # Create an instance to store game statistics,
         #   and create a scoreboard.
         self.stats = GameStats(self)
         self.sb = Scoreboard(self)
+
+        # Scores are written off the game loop. Headless simulations must not
+        #   clobber the player's record, so they don't get a writer.
+        if headless:
+            self.score_writer = None
+        else:
+            self.score_writer = HighScoreWriter(
+                self.settings.high_score_path, self.stats.leaderboard,
+                self.settings.high_score_save_delay)
+
+        # Sound effects, merged and channel-limited; headless games are silent.
+        self.audio = AudioManager(
+            self, {'shoot': SHOOT_SOUND, 'explosion': EXPLOSION_SOUND},
+            enabled=not headless)
         self.ship = Ship(self)
+        # A second player's ship, added by add_partner() for co-op.
+        self.partner = None
+
+        # Bullets are entities whose components are moved, culled and drawn
+        #   in batches; their sprites are views used by groups and collisions.
+        self.entity_store = entities.EntityStore()
+        bullet_components = ('position', 'prev_position', 'velocity', 'collider', 'bounds',
+                             'renderable')
+        self.entity_store.add('bullets', bullet_components, self.settings.bullets_allowed)
+        self.entity_store.add('alien_bullets', bullet_components,
+                              self.settings.alien_bullets_allowed)
 
         self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        self.fleet = Fleet(self)
+        self.aliens = self.fleet.aliens
         self.shields = pygame.sprite.Group()
 
+        # Recycled bullets, sized for the most that can be on screen
+        self.bullet_pool = SpritePool(
+            lambda: Bullet(self), self.settings.bullets_allowed)
+        self.alien_bullet_pool = SpritePool(
+            lambda: AlienBullet(self), self.settings.alien_bullets_allowed)
+
         # Shield skill system
         self.shield_active = False
         self.shield_start_time = 0
@@ -60,9 +151,12 @@ class AlienInvasion:
         
         # Ship crash animation
         self.ship_crashing = False
+        self.crashed_ship = None
         self.crash_start_time = 0
-        self.crash_particles = []
+        self.crash_particles = ParticleSystem(
+            self.settings.particle_capacity, seed=[self.seed, 2])
         self.ship_alpha = 255  # Ship transparency
+        self.flash_surface = None
         self.crash_delay_active = False
         self.crash_delay_start = 0
         
@@ -74,76 +168,179 @@ class AlienInvasion:
         # Make the Play button.
         self.play_button = Button(self, "Play")
 
-    def run_game(self):
-        """Start the main loop for the game."""
-        while True:
-            self._check_events()
-
-            if self.game_active:
-                if not self.crash_delay_active:
-                    self.ship.update()
-                    self._update_bullets()
-                    self._update_aliens()
-                    self._update_shield_skill()
-                self._update_crash_animation()
-                self._update_crash_delay()
+        # Optionally redraw and push only the changed parts of the screen
+        #   each frame; a scaled window still only erases changed parts.
+        self.dirty_renderer = None
+        if self.settings.dirty_rect_rendering:
+            self.dirty_renderer = DirtyRectRenderer(
+                self.screen, self.settings.bg_color,
+                self.settings.dirty_rect_threshold)
+
+        # Per-phase frame timings, toggled with F3.
+        self.profiler = FrameProfiler(
+            self, export_path=self.settings.profile_export_path)
+        if self.settings.profiling:
+            self.profiler.enable()
+
+    def _window_size(self, screen_size):
+        """Return settings.window_size, or the playfield size fit to the desktop."""
+        if self.settings.window_size:
+            return tuple(self.settings.window_size)
+        info = pygame.display.Info()
+        desktop_width, desktop_height = info.current_w, info.current_h
+        if desktop_width <= 0 or desktop_height <= 0:
+            return screen_size
+        factor = min(1, desktop_width / screen_size[0], desktop_height / screen_size[1])
+        if factor == 1:
+            return screen_size
+        return int(screen_size[0] * factor), int(screen_size[1] * factor)
+
+    def _refresh_rate(self):
+        """Return the refresh rate of the window's display, or 60 if unknown.
+
+        Only pygame-ce reports it; other builds always get 60.
+        """
+        get_refresh_rate = getattr(pygame.display, 'get_current_refresh_rate', None)
+        refresh_rate = get_refresh_rate() if get_refresh_rate else 0
+        return refresh_rate or 60
+
+    def run_game(self, max_frames=None):
+        """Start the main loop for the game.
+
+        The simulation advances in fixed ticks paid for out of an
+        accumulator of real time; frames are rendered as fast as max_fps
+        allows, interpolated between the last two ticks. A slow frame
+        makes the next one run extra ticks instead of slowing gameplay.
+        The loop returns after max_frames frames, if given.
+
+        The time from __init__ to the first frame on screen is kept in
+        first_frame_ms.
+        """
+        tick_ms = 1000 / self.settings.tick_rate
+        accumulator = 0.0
+        previous = perf_counter()
+        frames = 0
+        while max_frames is None or frames < max_frames:
+            now = perf_counter()
+            frame_ms = (now - previous) * 1000
+            previous = now
+            accumulator += min(frame_ms, tick_ms * self.settings.max_ticks_per_frame)
 
-            self._update_screen()
-            self.clock.tick(60)
+            self._check_events()
+            while accumulator >= tick_ms:
+                self.step()
+                accumulator -= tick_ms
+
+            self._update_screen(accumulator / tick_ms)
+            frames += 1
+            if self.first_frame_ms is None:
+                self.first_frame_ms = (perf_counter() - self.init_start) * 1000
+            if self.profiler.enabled:
+                self.profiler.end_frame()
+            self.clock.tick(self.settings.max_fps)
+
+    def step(self):
+        """Advance the simulation by exactly one tick, without rendering."""
+        self.ticks += 1
+        self.sim_time = self.ticks * 1000 // self.settings.tick_rate
+
+        if self.game_active:
+            if not self.crash_delay_active:
+                self.ship.update()
+                if self.partner:
+                    self.partner.update()
+                self._update_bullets()
+                self._update_aliens()
+                self._update_shield_skill()
+            self._update_crash_animation()
+            self._update_crash_delay()
+        self.audio.flush()
 
     def _check_events(self):
         """Respond to keypresses and mouse events."""
         for event in pygame.event.get():
+            if event.type == pygame.MOUSEBUTTONDOWN and self.presenter:
+                # Clicks are handled, and recorded, in playfield coordinates.
+                event = pygame.event.Event(
+                    event.type, event.dict, pos=self.presenter.to_logical(event.pos))
+            if self.recorder:
+                self.recorder.record(event)
             if event.type == pygame.QUIT:
-                sys.exit()
+                self._quit()
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
-
+                # Use where the click happened, which replays can record.
+                self._check_play_button(event.pos)
+            elif event.type == pygame.VIDEORESIZE:
+                if self.presenter:
+                    self.presenter.resize(pygame.display.get_surface())
+                self._redraw_all()
+            elif event.type == pygame.VIDEOEXPOSE:
+                self._redraw_all()
+
+    def _redraw_all(self):
+        """Draw the next frame in full, after the window was resized or uncovered."""
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
+
+
+    def add_partner(self):
+        """Add a second player's ship, which shares lives, score and bullets."""
+        self.partner = Ship(self)
+        self._center_ships()
+        return self.partner
+
+    def start_recording(self, path):
+        """Record this session's seed and input to path for replay.py."""
+        from replay import SessionRecorder
+        self.recorder = SessionRecorder(path, self)
 
     def _check_play_button(self, mouse_pos):
         """Start a new game when the player clicks Play."""
         button_clicked = self.play_button.rect.collidepoint(mouse_pos)
         if button_clicked and not self.game_active:
-            # Reset the game settings.
-            self.settings.initialize_dynamic_settings()
-
-            # Reset the game statistics.
-            self.stats.reset_stats()
-            self.sb.prep_score()
-            self.sb.prep_level()
-            self.sb.prep_ships()
-            self.game_active = True
-
-            # Get rid of any remaining bullets and aliens.
-            self.bullets.empty()
-            self.aliens.empty()
-            self.alien_bullets.empty()
-            self.shields.empty()
+            self.start_game()
+
+    def start_game(self):
+        """Reset the game state and start a new game."""
+        # Reset the game settings.
+        self.settings.initialize_dynamic_settings()
+
+        # Reset the game statistics.
+        self.stats.reset_stats()
+        self.sb.prep_score()
+        self.sb.prep_level()
+        self.sb.prep_ships()
+        self.game_active = True
+
+        # Get rid of any remaining bullets and aliens.
+        self.bullet_pool.release_all(self.bullets)
+        self.fleet.clear()
+        self.alien_bullet_pool.release_all(self.alien_bullets)
+        self.shields.empty()
+
+        # Reset shield skill
+        self.shield_active = False
+        self.shield_start_time = 0
+        self.shield_last_used = 0
+        
+        # Reset crash animation states
+        self.ship_crashing = False
+        self.crash_start_time = 0
+        self.crash_particles.clear()
+        self.ship_alpha = 255
+        self.crash_delay_active = False
+        self.crash_delay_start = 0
 
-            # Reset shield skill
-            self.shield_active = False
-            self.shield_start_time = 0
-            self.shield_last_used = 0
-            
-            # Reset crash animation states
-            self.ship_crashing = False
-            self.crash_start_time = 0
-            self.crash_particles.clear()
-            self.ship_alpha = 255
-            self.crash_delay_active = False
-            self.crash_delay_start = 0
-
-            # Create a new fleet and center the ship.
-            self._create_fleet()
-            self.ship.center_ship()
+        # Create a new fleet and center the ship.
+        self._create_fleet()
+        self._center_ships()
 
-            # Hide the mouse cursor.
-            pygame.mouse.set_visible(False)
+        # Hide the mouse cursor.
+        pygame.mouse.set_visible(False)
 
     def _check_keydown_events(self, event):
         """Respond to keypresses."""
@@ -152,12 +349,13 @@ class AlienInvasion:
         elif event.key == pygame.K_LEFT:
             self.ship.moving_left = True
         elif event.key == pygame.K_q:
-            self._save_high_score()
-            sys.exit()
+            self._quit()
         elif event.key == pygame.K_SPACE:
             self._fire_bullet()
         elif event.key == pygame.K_LCTRL or event.key == pygame.K_RCTRL:
             self._activate_shield_skill()
+        elif event.key == pygame.K_F3:
+            self.profiler.toggle()
 
     def _check_keyup_events(self, event):
         """Respond to key releases."""
@@ -166,51 +364,56 @@ class AlienInvasion:
         elif event.key == pygame.K_LEFT:
             self.ship.moving_left = False
 
-    def _fire_bullet(self):
-        """Create a new bullet and add it to the bullets group."""
+    def _fire_bullet(self, ship=None):
+        """Create a new bullet from ship, or the player's ship, and add it to the bullets group."""
         if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
+            new_bullet = self.bullet_pool.acquire(ship)
             self.bullets.add(new_bullet)
-        if self.shoot_sound:
-            self.shoot_sound.play()
+            self.audio.play('shoot')
 
     def _update_bullets(self):
         """Update position of bullets and get rid of old bullets."""
-        # Update bullet positions.
-        self.bullets.update()
-        self.alien_bullets.update()
-
-        # Get rid of bullets that have disappeared.
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
-
-        for bullet in self.alien_bullets.copy():
-            if bullet.rect.top >= self.settings.screen_height:
-                self.alien_bullets.remove(bullet)
+        # Update bullet positions; bullets that leave the screen go back to
+        #   their pools.
+        self._move_bullets('bullets', self.settings.bullet_speed)
+        self._move_bullets('alien_bullets', self.settings.alien_bullet_speed)
 
         self._check_alien_bullet_ship_collision()
         self._check_bullet_alien_collisions()
         self._check_bullet_shield_collisions()
         self._check_alien_bullet_shield_collisions()
 
+    def _move_bullets(self, name, speed):
+        """Move every bullet in the named archetype, and cull those off screen."""
+        archetype = self.entity_store[name]
+        entities.move(archetype, speed * self.settings.tick_scale)
+        entities.EntitySprite.kill_all(entities.outside(
+            archetype, self.settings.screen_width, self.settings.screen_height))
+
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collisions."""
-        # Remove any bullets and aliens that have collided.
-        collisions = pygame.sprite.groupcollide(
-                self.bullets, self.aliens, True, True)
+        # Remove any bullets and aliens that have collided, testing every
+        #   bullet against the fleet's arrays at once.
+        bullets = self.entity_store['bullets']
+        collisions = {}
+        if bullets.count:
+            collisions = self.fleet.hits(bullets['bounds'], bullets.owners[0].mask)
 
         if collisions:
-            for aliens in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens)
+            shooters = [bullets.owners[row] for row in collisions]
+            for slots in collisions.values():
+                for slot in slots:
+                    self.fleet.sprites[slot].kill()
+                self.stats.score += self.settings.alien_points * len(slots)
+            for bullet in shooters:
+                bullet.kill()
             self.sb.prep_score()
             self.sb.check_high_score()
-            if self.explosion_sound:
-                self.explosion_sound.play()
+            self.audio.play('explosion')
 
         if not self.aliens:
             # Destroy existing bullets and create new fleet.
-            self.bullets.empty()
+            self.bullet_pool.release_all(self.bullets)
             self._create_fleet()
             self.settings.increase_speed()
 
@@ -218,20 +421,20 @@ class AlienInvasion:
             self.stats.level += 1
             self.sb.prep_level()
 
-    def _ship_hit(self):
-        """Respond to the ship being hit by an alien."""
+    def _ship_hit(self, ship=None):
+        """Respond to the ship, or the given co-op ship, being hit by an alien."""
         if self.stats.ships_left > 0:
             # Start crash animation
-            self._start_ship_crash()
+            self._start_ship_crash(ship)
             
             # Decrement ships_left, and update scoreboard.
             self.stats.ships_left -= 1
             self.sb.prep_ships()
 
             # Get rid of any remaining bullets and aliens.
-            self.bullets.empty()
-            self.aliens.empty()
-            self.alien_bullets.empty()
+            self.bullet_pool.release_all(self.bullets)
+            self.fleet.clear()
+            self.alien_bullet_pool.release_all(self.alien_bullets)
             self.shields.empty()
 
             # Deactivate shield skill
@@ -240,82 +443,70 @@ class AlienInvasion:
 
             # Start delay after crash
             self.crash_delay_active = True
-            self.crash_delay_start = pygame.time.get_ticks()
+            self.crash_delay_start = self.sim_time
         else:
             # Start final crash animation
-            self._start_ship_crash()
+            self._start_ship_crash(ship)
             # Delay before game over
             self.crash_delay_active = True
-            self.crash_delay_start = pygame.time.get_ticks()
+            self.crash_delay_start = self.sim_time
 
     def _check_alien_bullet_ship_collision(self):
         """Respond to alien bullets hitting the ship."""
-        if pygame.sprite.spritecollideany(self.ship, self.alien_bullets):
+        if self._alien_bullet_hits(self.ship):
             self._ship_hit()
+        elif self.partner and self._alien_bullet_hits(self.partner):
+            self._ship_hit(self.partner)
+
+    def _alien_bullet_hits(self, ship):
+        """Return True if an alien bullet touches ship, pixel by pixel."""
+        return any(pygame.sprite.collide_mask(ship, bullet) for bullet in
+                   entities.overlapping(self.entity_store['alien_bullets'], ship.rect))
         
 
     def _update_aliens(self):
-        """Check if the fleet is at an edge, then update positions."""
-        self._check_fleet_edges()
-        self.aliens.update()
+        """Move the fleet, then check it against the ship and the bottom."""
+        self.fleet.update()
 
         # Look for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.fleet.collides_with(self.ship.rect, self.ship.mask):
             self._ship_hit()
+        elif self.partner and self.fleet.collides_with(self.partner.rect, self.partner.mask):
+            self._ship_hit(self.partner)
 
         # Look for aliens hitting the bottom of the screen.
-        self._check_aliens_bottom()
+        if self.fleet.reached_bottom():
+            # Treat this the same as if the ship got hit.
+            self._ship_hit()
 
-    def _check_aliens_bottom(self):
-        """Check if any aliens have reached the bottom of the screen."""
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                # Treat this the same as if the ship got hit.
-                self._ship_hit()
-                break
+    def _center_ships(self):
+        """Center the ship, or put the co-op ships either side of center."""
+        if self.partner is None:
+            self.ship.center_ship()
+            return
+        self.ship.center_ship(-self.ship.rect.width)
+        self.partner.center_ship(self.partner.rect.width)
 
     def _create_fleet(self):
-        """Create the fleet of aliens."""
-        # Create an alien and keep adding aliens until there's no room left.
-        # Spacing between aliens is one alien width and one alien height.
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-
-        current_x, current_y = alien_width, alien_height
-        while current_y < (self.settings.screen_height - 3 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += 2 * alien_width
-
-            # Finished a row; reset x value, and increment y value.
-            current_x = alien_width
-            current_y += 2 * alien_height
-
-    def _create_alien(self, x_position, y_position):
-        """Create an alien and place it in the fleet."""
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
-        self.aliens.add(new_alien)
-
-    def _check_fleet_edges(self):
-        """Respond appropriately if any aliens have reached an edge."""
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
-
-    def _change_fleet_direction(self):
-        """Drop the entire fleet and change the fleet's direction."""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
-        self.settings.fleet_direction *= -1
+        """Create the fleet of aliens from the cached formation."""
+        self.fleet.spawn(self.fleet.formation())
 
     def _save_high_score(self):
-        """Save the high score to a file."""
-        with open('high_score.json', 'w') as f:
-            json.dump(self.stats.high_score, f)
+        """Queue the high score to be saved by the background writer."""
+        if self.score_writer:
+            self.score_writer.save(self.stats.high_score)
+
+    def _record_game(self):
+        """Queue the finished game for the leaderboard."""
+        if self.score_writer:
+            self.score_writer.record_game(self.stats.score, self.stats.level)
+
+    def _quit(self):
+        """Silence the game and write any queued scores, then exit."""
+        self.audio.stop()
+        if self.score_writer:
+            self.score_writer.close()
+        sys.exit()
 
     def _activate_shield_skill(self):
         """Activate shield skill if available."""
@@ -323,7 +514,7 @@ class AlienInvasion:
         if not self.game_active:
             return
             
-        current_time = pygame.time.get_ticks()
+        current_time = self.sim_time
         cooldown_remaining = current_time - self.shield_last_used
         
         # Check if skill is on cooldown
@@ -347,7 +538,7 @@ class AlienInvasion:
         if not self.shield_active:
             return
             
-        current_time = pygame.time.get_ticks()
+        current_time = self.sim_time
         
         # Update shield animations and positions
         self.shields.update()
@@ -365,188 +556,145 @@ class AlienInvasion:
         shield = Shield(self, self.ship)
         self.shields.add(shield)
 
-    def _start_ship_crash(self):
-        """Start the ship crash animation."""
+    def _start_ship_crash(self, ship=None):
+        """Start the crash animation for ship, or the player's ship."""
+        self.crashed_ship = ship or self.ship
         self.ship_crashing = True
-        self.crash_start_time = pygame.time.get_ticks()
+        self.crash_start_time = self.sim_time
         self.ship_alpha = 255
         
-        # Play explosion sound if available
-        if self.explosion_sound:
-            self.explosion_sound.play()
+        self.audio.play('explosion')
         
         # Create explosion particles
-        ship_center = self.ship.rect.center
-        for i in range(35):  # More particles for dramatic effect
-            angle = random.uniform(0, 2 * 3.14159)  # Random direction
-            speed = random.uniform(3, 8)  # Faster particles
-            particle = {
-                'x': float(ship_center[0]),
-                'y': float(ship_center[1]),
-                'vel_x': speed * random.uniform(-1, 1) * 2,  # Wider spread
-                'vel_y': speed * random.uniform(-1, 1) * 2,
-                'color': random.choice([(255, 80, 0), (255, 180, 0), (255, 255, 80), 
-                                       (255, 0, 0), (255, 120, 20), (255, 255, 255),
-                                       (200, 50, 0), (255, 200, 100)]),  # More colors
-                'life': random.randint(60, 120),  # Longer life
-                'max_life': random.randint(60, 120),
-                'size': random.randint(3, 8)  # Bigger particles
-            }
-            self.crash_particles.append(particle)
-            
+        self.crash_particles.emit(self.crashed_ship.rect.center, 35)
+
     def _update_crash_animation(self):
         """Update crash animation effects."""
         if not self.ship_crashing:
             return
             
         # Gradually fade ship (slower fade)
-        fade_speed = 2
+        fade_speed = 2 * self.settings.tick_scale
         self.ship_alpha = max(0, self.ship_alpha - fade_speed)
         
         # Update particles
-        for particle in self.crash_particles[:]:
-            particle['x'] += particle['vel_x']
-            particle['y'] += particle['vel_y']
-            particle['vel_y'] += 0.1  # Gravity effect
-            particle['vel_x'] *= 0.985  # Air resistance
-            particle['life'] -= 1
-            
-            if particle['life'] <= 0:
-                self.crash_particles.remove(particle)
-                
+        self.crash_particles.update(self.settings.tick_scale)
+
     def _draw_crash_effects(self):
-        """Draw crash animation effects."""
+        """Draw crash animation effects, and return the rects drawn."""
         # Draw explosion particles
-        particles_drawn = 0
-        for particle in self.crash_particles:
-            if particle['life'] > 0:
-                alpha_ratio = max(0, particle['life'] / particle['max_life'])
-                size = max(1, int(particle['size'] * alpha_ratio))
-                
-                # Draw particle with fading effect - ensure color values are valid
-                color = tuple(max(0, min(255, int(c * alpha_ratio))) for c in particle['color'])
-                if sum(color) > 0 and size > 0:  # Only draw if visible and valid
-                    try:
-                        pygame.draw.circle(self.screen, color, 
-                                         (int(particle['x']), int(particle['y'])), size)
-                        particles_drawn += 1
-                    except (ValueError, TypeError):
-                        # Skip invalid particles
-                        continue
-        
+        drawn = self.crash_particles.draw(self.screen)
+
         # Draw fading ship
         if self.ship_crashing and self.ship_alpha > 0:
             # Create semi-transparent ship surface
-            ship_surface = self.ship.image.copy()
+            ship_surface = self.crashed_ship.image.copy()
             ship_surface.set_alpha(max(0, min(255, int(self.ship_alpha))))
-            self.screen.blit(ship_surface, self.ship.rect)
+            drawn.append(self.screen.blit(ship_surface, self.crashed_ship.rect))
             
         # Add screen flash effect for dramatic crash
         if self.ship_crashing:
-            current_time = pygame.time.get_ticks()
+            current_time = self.sim_time
             time_since_crash = current_time - self.crash_start_time
             
             # Flash effect for first 500ms
             if time_since_crash < 500:
                 flash_alpha = max(0, min(255, int(100 - (time_since_crash * 0.2))))
                 if flash_alpha > 0:
-                    flash_surface = pygame.Surface((self.settings.screen_width, 
-                                                  self.settings.screen_height))
-                    flash_surface.set_alpha(flash_alpha)
-                    flash_surface.fill((255, 255, 255))
-                    self.screen.blit(flash_surface, (0, 0))
-
-    def _draw_shield_ui(self):
-        """Draw shield skill UI information."""
-        current_time = pygame.time.get_ticks()
-        
-        # Calculate cooldown remaining
-        cooldown_remaining = max(0, self.settings.shield_cooldown - (current_time - self.shield_last_used))
-        
-        # Draw skill status
-        font = pygame.font.SysFont(None, 36)
-        
-        if self.shield_active:
-            # Show duration remaining
-            duration_remaining = max(0, self.settings.shield_duration - (current_time - self.shield_start_time))
-            status_text = f"Shield: {duration_remaining // 1000 + 1}s"
-            color = (0, 255, 0)  # Green when active
-        elif cooldown_remaining > 0:
-            # Show cooldown
-            status_text = f"Shield: {cooldown_remaining // 1000 + 1}s"
-            color = (255, 0, 0)  # Red when on cooldown
-        else:
-            # Ready to use
-            status_text = "Shield: Ready [Ctrl]"
-            color = (255, 255, 255)  # White when ready
-            
-        text_surface = font.render(status_text, True, color)
-        text_rect = text_surface.get_rect()
-        text_rect.left = self.screen.get_rect().left + 20
-        text_rect.bottom = self.screen.get_rect().bottom - 50
-        
-        self.screen.blit(text_surface, text_rect)
+                    # One white surface is kept, since an arena-sized one is
+                    #   too big to allocate every frame.
+                    if self.flash_surface is None:
+                        self.flash_surface = pygame.Surface(self.screen.get_size())
+                        self.flash_surface.fill((255, 255, 255))
+                    self.flash_surface.set_alpha(flash_alpha)
+                    drawn.append(self.screen.blit(self.flash_surface, (0, 0)))
+        return drawn
 
     def _check_bullet_shield_collisions(self):
         """Check for collisions between player bullets and shields."""
-        for bullet in self.bullets.sprites():
-            hit_shields = pygame.sprite.spritecollide(bullet, self.shields, False)
-            if hit_shields:
-                bullet.kill()
-                for shield in hit_shields:
-                    if shield.hit(damage=20):
-                        continue  # Shield already removed by hit()
+        self._check_shield_collisions(self.entity_store['bullets'])
 
     def _check_alien_bullet_shield_collisions(self):
         """Check for collisions between alien bullets and shields."""
-        for bullet in self.alien_bullets.sprites():
-            hit_shields = pygame.sprite.spritecollide(bullet, self.shields, False)
+        self._check_shield_collisions(self.entity_store['alien_bullets'])
+
+    def _check_shield_collisions(self, archetype):
+        """Remove bullets of archetype that reach a shield, and damage the shields."""
+        struck = {}
+        for shield in self.shields.sprites():
+            for bullet in entities.in_circle(archetype, shield.rect, shield.radius):
+                struck.setdefault(bullet, []).append(shield)
+
+        # Bullets resolve in firing order; a shield destroyed by one bullet
+        #   no longer stops the ones after it.
+        for bullet in sorted(struck, key=lambda bullet: archetype.row(bullet.entity)):
+            hit_shields = [shield for shield in struck[bullet] if shield.alive()]
             if hit_shields:
                 bullet.kill()
                 for shield in hit_shields:
-                    if shield.hit(damage=20):
-                        continue  # Shield already removed by hit()
-
-    def _update_screen(self):
-        """Update images on the screen, and flip to the new screen."""
-        self.screen.fill(self.settings.bg_color)
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-        
-        # Draw ship (only when not crashing, crash effects handles fading ship)
-        if not self.ship_crashing:
-            self.ship.blitme()
+                    shield.hit(damage=20)
+
+    def _update_screen(self, alpha=1.0):
+        """Update images on the screen, and flip to the new screen.
+
+        Moving objects are drawn alpha of the way from their position on
+        the previous tick to the current one.
+        """
+        if self.dirty_renderer:
+            self.dirty_renderer.begin_frame()
+        else:
+            self.screen.fill(self.settings.bg_color)
+
+        drawn = self._draw_frame(alpha)
+
+        if self.presenter:
+            if self.dirty_renderer:
+                self.dirty_renderer.present(drawn, push=False)
+            self.presenter.present()
+        elif self.dirty_renderer:
+            self.dirty_renderer.present(drawn)
+        elif not self.headless:
+            pygame.display.flip()
+
+    def _draw_frame(self, alpha=1.0):
+        """Draw every game object onto the screen, and return the rects drawn."""
+        drawn = entities.draw_rects(self.entity_store['bullets'], self.screen, alpha)
+
+        # Draw ships (not the crashing one, crash effects handles fading ship)
+        for ship in (self.ship, self.partner):
+            if ship and not (self.ship_crashing and ship is self.crashed_ship):
+                drawn.append(ship.blitme(alpha))
         
         # Draw shields
         for shield in self.shields.sprites():
-            shield.draw()
+            drawn.extend(shield.draw(alpha))
         
-        for alien_bullet in self.alien_bullets.sprites(): 
-            alien_bullet.draw_bullet()
+        drawn.extend(entities.draw_rects(self.entity_store['alien_bullets'], self.screen, alpha))
 
-        self.aliens.draw(self.screen)
+        drawn.extend(self.fleet.draw(self.screen, alpha))
         
         # Always draw crash effects (handles crash particles and fading ship)
-        self._draw_crash_effects()
+        drawn.extend(self._draw_crash_effects())
 
-        # Draw the score information.
-        self.sb.show_score()
-        
-        # Draw shield skill UI
-        self._draw_shield_ui()
+        # Draw the score information and shield skill status.
+        drawn.extend(self.sb.show_score())
 
         # Draw the play button if the game is inactive.
         if not self.game_active:
-            self.play_button.draw_button()
+            drawn.append(self.play_button.draw_button())
 
-        pygame.display.flip()
+        # Draw the profiler overlay when it's on.
+        if self.profiler.enabled:
+            drawn.append(self.profiler.draw(self.screen))
+
+        return drawn
 
     def _update_crash_delay(self):
         """Handle the delay after ship crash before continuing."""
         if not self.crash_delay_active:
             return
             
-        current_time = pygame.time.get_ticks()
+        current_time = self.sim_time
         
         if self.stats.ships_left > 0:
             # Normal crash - wait 1.5 seconds
@@ -558,17 +706,75 @@ class AlienInvasion:
                 self.ship_alpha = 255
                 # Create a new fleet and center the ship.
                 self._create_fleet()
-                self.ship.center_ship()
+                self._center_ships()
         else:
             # Final crash - wait 2.5 seconds
             if current_time - self.crash_delay_start > 2500:
                 self.crash_delay_active = False
                 self.game_active = False
                 pygame.mouse.set_visible(True)
+                self.audio.stop()
                 self._save_high_score()
+                self._record_game()
+
+
+def size(text):
+    """Parse a WxH size argument."""
+    try:
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive, got {text!r}")
+    return width, height
+
+
+def frame_rate(text):
+    """Parse a --fps argument: frames per second, or 0 for uncapped."""
+    try:
+        fps = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {text!r}")
+    if fps < 0:
+        raise argparse.ArgumentTypeError(f"frame rate can't be negative, got {text!r}")
+    return fps
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument('--record', metavar='PATH',
+                        help="record the session for replay.py")
+    parser.add_argument('--seed', type=int, help="seed for every random stream")
+    parser.add_argument('--startup-time', action='store_true',
+                        help="print the time to the first frame, then quit")
+    parser.add_argument('--arena', type=size, metavar='WxH',
+                        help="playfield size, e.g. 7680x4320 for thousands of aliens")
+    parser.add_argument('--window', type=size, metavar='WxH',
+                        help="window size to scale the playfield to")
+    parser.add_argument('--scaler', choices=sorted(ScaledPresenter.scalers),
+                        help="how the playfield is scaled to the window")
+    parser.add_argument('--fps', type=frame_rate,
+                        help="frames per second to render, 0 for uncapped "
+                             "(default: the display's refresh rate)")
+    args = parser.parse_args()
+
+    settings = Settings()
+    if args.arena:
+        settings.set_arena(*args.arena)
+    if args.window:
+        settings.window_size = args.window
+    if args.scaler:
+        settings.scaler = args.scaler
+    if args.fps is not None:
+        settings.max_fps = args.fps
+
     # Make a game instance, and run the game.
-    ai = AlienInvasion()
+    ai = AlienInvasion(seed=args.seed, settings=settings)
+    if args.record:
+        ai.start_recording(args.record)
+    if args.startup_time:
+        ai.run_game(max_frames=1)
+        print(f"First frame {ai.first_frame_ms:.1f} ms after start-up, "
+              f"{(ai.init_start - LAUNCH_TIME) * 1000 + ai.first_frame_ms:.1f} ms after launch")
+        ai._quit()
     ai.run_game()
\ No newline at end of file
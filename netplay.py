@@ -0,0 +1,788 @@
+"""Play co-op over the network: one game simulates, a second player joins.
+
+    python netplay.py host --port 5555              # play, and wait for a partner
+    python netplay.py join 192.168.1.20:5555        # join as the second ship
+    python netplay.py loopback --latency 60 --loss 0.05   # check both ends
+
+The host runs the only simulation, with the partner's ship added to it.
+Every tick the client sends its buttons and the host sends back a
+snapshot of what the client draws. Both travel as UDP datagrams, so a
+lost packet is never waited for:
+
+  * Snapshots are a fixed-size record, less the last snapshot the
+    client acknowledged byte by byte, and deflated. Unchanged fields
+    become zeros, bullets moving at one speed become repeats, and the
+    fleet is sent as one offset from its formation plus alive bits, so
+    a typical snapshot is under 40 bytes.
+  * Input packets repeat every input the host hasn't acknowledged yet,
+    so one that's lost is covered by the next.
+  * Snapshots carry the last input the host applied. The client moves
+    its own ship at once, and when a snapshot arrives it replays the
+    inputs the host hasn't seen on top of the host's position.
+
+LossyTransport delays, jitters and drops datagrams on their way out, so
+the loopback check runs both ends over real sockets on this machine
+with a bad network in between.
+"""
+import argparse
+import heapq
+import socket
+import struct
+import sys
+import zlib
+from collections import OrderedDict, deque
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+from main import AlienInvasion
+from settings import Settings
+from shield import Shield
+
+
+MAGIC = b'AICO'
+VERSION = 2
+DEFAULT_PORT = 5555
+
+KIND = struct.Struct('<B')
+HELLO = struct.Struct('<4sB')        # magic, version
+WELCOME = struct.Struct('<HHHH')     # screen width, height, tick rate, snapshot size
+INPUT = struct.Struct('<IIB')        # snapshot ack, first input sequence, count
+SNAPSHOT = struct.Struct('<IBI')     # tick, ticks back to the baseline (0 for none), input ack
+COUNT = struct.Struct('<H')          # bullets in a snapshot
+
+# Bullet positions are int16s, and a record's size must fit WELCOME and,
+#   deflated, one UDP datagram with room to spare.
+MAX_COORDINATE = 32767
+MAX_RECORD_SIZE = 60000
+
+HELLO_KIND, WELCOME_KIND, INPUT_KIND, SNAPSHOT_KIND, BYE_KIND = 1, 2, 3, 4, 5
+
+# Input buttons, one bit each
+LEFT, RIGHT, FIRE = 1, 2, 4
+
+# Game flags in a snapshot
+ACTIVE, CRASHING, CRASH_DELAY, SHIELD_ACTIVE, PARTNER_CRASHED = 1, 2, 4, 8, 16
+
+
+class SnapshotLayout:
+    """A class to pack the state a co-op client draws into a fixed-size record.
+
+    The record is the game state below, the fleet's alive bits, and a
+    count plus int16 (x, y) slots for each kind of bullet. Both ends build
+    the layout from the same settings, so a record lines up field for
+    field with the one it's a delta against. Playfields too big for the
+    record raise ValueError.
+    """
+
+    # flags, score, high score, level, ships left, shield last used,
+    #   ship x, partner x, ship speed, fleet dx, fleet dy, shield health
+    STATE = struct.Struct('<BIIHBIfffffh')
+
+    def __init__(self, ai_game):
+        """Size the record for ai_game's formation and bullet limits."""
+        settings = ai_game.settings
+        self.fleet_size = len(ai_game.fleet.formation())
+        self.bullet_slots = settings.bullets_allowed
+        # Bursts can take the fleet past its limit; extra bullets aren't sent.
+        self.alien_bullet_slots = 2 * settings.alien_bullets_allowed
+        self.size = (self.STATE.size + (self.fleet_size + 7) // 8
+                     + COUNT.size + 4 * self.bullet_slots
+                     + COUNT.size + 4 * self.alien_bullet_slots)
+        if max(settings.screen_width, settings.screen_height) > MAX_COORDINATE:
+            raise ValueError(f"a {settings.screen_width}x{settings.screen_height} arena is "
+                             f"too big for co-op; sides are at most {MAX_COORDINATE}")
+        if self.size > MAX_RECORD_SIZE:
+            raise ValueError(f"snapshots would be {self.size} bytes; "
+                             f"co-op allows at most {MAX_RECORD_SIZE}")
+
+    def pack(self, ai_game):
+        """Return ai_game's current state as a record."""
+        flags = ((ACTIVE if ai_game.game_active else 0)
+                 | (CRASHING if ai_game.ship_crashing else 0)
+                 | (CRASH_DELAY if ai_game.crash_delay_active else 0)
+                 | (SHIELD_ACTIVE if ai_game.shield_active else 0)
+                 | (PARTNER_CRASHED if ai_game.ship_crashing
+                    and ai_game.crashed_ship is ai_game.partner else 0))
+        stats = ai_game.stats
+        shield = next(iter(ai_game.shields), None)
+        fleet_dx, fleet_dy = ai_game.fleet.offset()
+        state = self.STATE.pack(
+            flags, stats.score, stats.high_score, stats.level, stats.ships_left,
+            ai_game.shield_last_used, ai_game.ship.x, ai_game.partner.x,
+            ai_game.settings.ship_speed, fleet_dx, fleet_dy,
+            shield.health if shield else 0)
+        return b''.join((state, np.packbits(ai_game.fleet.alive).tobytes(),
+                         self._pack_bullets(ai_game.bullets, self.bullet_slots),
+                         self._pack_bullets(ai_game.alien_bullets, self.alien_bullet_slots)))
+
+    @staticmethod
+    def _pack_bullets(group, slots):
+        """Return a count and slots (x, y) pairs for the bullets in group."""
+        positions = np.zeros((slots, 2), np.int16)
+        bullets = group.sprites()[:slots]
+        for i, bullet in enumerate(bullets):
+            positions[i] = bullet.rect.x, bullet.rect.y
+        return COUNT.pack(len(bullets)) + positions.tobytes()
+
+    def unpack(self, record):
+        """Return (state tuple, fleet alive flags, bullets, alien bullets) from a record."""
+        state = self.STATE.unpack_from(record)
+        offset = self.STATE.size
+        fleet_bytes = (self.fleet_size + 7) // 8
+        alive = np.unpackbits(np.frombuffer(record, np.uint8, fleet_bytes, offset),
+                              count=self.fleet_size).astype(bool)
+        offset += fleet_bytes
+        bullets = self._unpack_bullets(record, offset, self.bullet_slots)
+        offset += COUNT.size + 4 * self.bullet_slots
+        alien_bullets = self._unpack_bullets(record, offset, self.alien_bullet_slots)
+        return state, alive, bullets, alien_bullets
+
+    @staticmethod
+    def _unpack_bullets(record, offset, slots):
+        """Return the (x, y) pairs of the bullets packed at offset."""
+        count, = COUNT.unpack_from(record, offset)
+        positions = np.frombuffer(record, np.int16, 2 * slots,
+                                  offset + COUNT.size).reshape(slots, 2)
+        return positions[:count].tolist()
+
+
+def encode_delta(record, baseline=None):
+    """Return record compressed as a delta against baseline, or on its own.
+
+    The delta is the bytewise difference, modulo 256, which turns small
+    integer changes into runs deflate packs well. Raw deflate streams
+    skip zlib's header and checksum; UDP checks the datagram anyway.
+    """
+    if baseline is not None:
+        record = (np.frombuffer(record, np.uint8) - np.frombuffer(baseline, np.uint8)).tobytes()
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return compressor.compress(record) + compressor.flush()
+
+
+def decode_delta(payload, baseline=None):
+    """Return the record encode_delta() turned into payload."""
+    record = zlib.decompress(payload, -15)
+    if baseline is not None:
+        record = (np.frombuffer(record, np.uint8) + np.frombuffer(baseline, np.uint8)).tobytes()
+    return record
+
+
+def is_hello(packet):
+    """Return whether packet is a HELLO from a client speaking this version."""
+    return (len(packet) >= KIND.size + HELLO.size and packet[0] == HELLO_KIND
+            and HELLO.unpack_from(packet, KIND.size) == (MAGIC, VERSION))
+
+
+class UdpTransport:
+    """A class to exchange datagrams with one peer over a non-blocking UDP socket.
+
+    Without a peer, the first address a valid HELLO arrives from becomes
+    the peer; datagrams from anywhere else are ignored.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), peer=None):
+        """Bind a socket to address, talking to peer if it's known."""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind(address)
+        self.address = self.socket.getsockname()
+        self.peer = peer
+
+    def send(self, data):
+        """Send data to the peer, if there is one; delivery isn't guaranteed."""
+        if self.peer is None:
+            return
+        try:
+            self.socket.sendto(data, self.peer)
+        except (BlockingIOError, ConnectionRefusedError):
+            pass
+
+    def receive(self):
+        """Return every datagram from the peer waiting on the socket."""
+        packets = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(65535)
+            except BlockingIOError:
+                return packets
+            except ConnectionRefusedError:
+                # An earlier datagram found nobody listening.
+                continue
+            if self.peer is None and is_hello(data):
+                self.peer = address
+            if address == self.peer:
+                packets.append(data)
+
+    def close(self):
+        """Close the socket."""
+        self.socket.close()
+
+
+class LossyTransport:
+    """A class to stand in for a slow, lossy network in front of another transport.
+
+    Each datagram sent is dropped with probability loss, or held back for
+    latency_ms plus up to jitter_ms, so packets can also arrive out of
+    order. Held datagrams go out on later send() and receive() calls.
+    Time comes from clock(), in ms, so tests can run faster than real time.
+    """
+
+    def __init__(self, transport, latency_ms=0, jitter_ms=0, loss=0.0,
+                 seed=None, clock=None):
+        """Wrap transport with the given one-way latency, jitter and loss."""
+        self.transport = transport
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self.rng = np.random.default_rng(seed)
+        self.clock = clock or (lambda: perf_counter() * 1000)
+
+        # Held datagrams as (due time, send order, data)
+        self.held = []
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def address(self):
+        """Return the wrapped transport's address."""
+        return self.transport.address
+
+    @property
+    def peer(self):
+        """Return the wrapped transport's peer."""
+        return self.transport.peer
+
+    @peer.setter
+    def peer(self, peer):
+        self.transport.peer = peer
+
+    def send(self, data):
+        """Drop data, or hold it until the simulated network delivers it."""
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+        else:
+            due = self.clock() + self.latency_ms + self.rng.random() * self.jitter_ms
+            heapq.heappush(self.held, (due, self.sent, data))
+        self._deliver()
+
+    def receive(self):
+        """Deliver held datagrams that are due, then receive from the transport."""
+        self._deliver()
+        return self.transport.receive()
+
+    def _deliver(self):
+        """Send on every held datagram whose time has come."""
+        now = self.clock()
+        while self.held and self.held[0][0] <= now:
+            self.transport.send(heapq.heappop(self.held)[2])
+
+    def close(self):
+        """Close the wrapped transport, dropping anything still held."""
+        self.held.clear()
+        self.transport.close()
+
+
+class CoopHost:
+    """A class to run a game's simulation for its player and one remote partner.
+
+    Creating a host adds the partner's ship to ai_game and shadows the
+    game's step() on the instance, so run_game() takes the partner's
+    input and sends a snapshot on every tick.
+    """
+
+    # Snapshots kept to delta against, and partner inputs queued at most
+    history = 64
+    max_queued_inputs = 4
+
+    def __init__(self, ai_game, transport):
+        """Host ai_game's co-op session on transport."""
+        self.ai_game = ai_game
+        self.transport = transport
+        self.partner = ai_game.add_partner()
+        self.layout = SnapshotLayout(ai_game)
+        self.connected = False
+
+        # Partner inputs as (sequence, buttons) waiting for their tick
+        self.inputs = deque()
+        self.last_input = 0
+        self.applied_input = 0
+        # Sent records by tick, and the newest tick the client has
+        self.records = OrderedDict()
+        self.snapshot_ack = 0
+
+        self.snapshots_sent = 0
+        self.bytes_sent = 0
+
+        self.game_step = ai_game.step
+        ai_game.step = self.step
+
+    def step(self):
+        """Take the partner's input, advance the game a tick, and send a snapshot."""
+        self.receive()
+        self._apply_input()
+        self.game_step()
+        if self.connected:
+            self.send_snapshot()
+
+    def receive(self):
+        """Handle every datagram the partner has sent, dropping malformed ones."""
+        for packet in self.transport.receive():
+            if not packet:
+                continue
+            kind = packet[0]
+            if kind == HELLO_KIND:
+                if is_hello(packet):
+                    self._welcome()
+            elif kind == INPUT_KIND and self.connected:
+                self._queue_inputs(packet)
+            elif kind == BYE_KIND:
+                self._disconnect()
+
+    def _welcome(self):
+        """Accept the partner and tell it how the game is set up."""
+        settings = self.ai_game.settings
+        self.connected = True
+        self.transport.send(KIND.pack(WELCOME_KIND) + WELCOME.pack(
+            settings.screen_width, settings.screen_height, settings.tick_rate,
+            self.layout.size))
+
+    def _disconnect(self):
+        """Forget the partner, leaving its ship idle, so another can join."""
+        self.connected = False
+        self.transport.peer = None
+        self.inputs.clear()
+        self.last_input = self.applied_input = 0
+        self.snapshot_ack = 0
+        self.partner.moving_left = self.partner.moving_right = False
+
+    def _queue_inputs(self, packet):
+        """Queue the inputs in packet that haven't been seen yet.
+
+        A packet cut short of its header or buttons is dropped.
+        """
+        if len(packet) < KIND.size + INPUT.size:
+            return
+        snapshot_ack, first, count = INPUT.unpack_from(packet, KIND.size)
+        buttons = packet[KIND.size + INPUT.size:KIND.size + INPUT.size + count]
+        if len(buttons) < count:
+            return
+        self.snapshot_ack = max(self.snapshot_ack, snapshot_ack)
+        for sequence in range(max(first, self.last_input + 1), first + count):
+            self.inputs.append((sequence, buttons[sequence - first]))
+            self.last_input = sequence
+
+    def _apply_input(self):
+        """Apply the partner's next input to its ship.
+
+        One input is used per tick, as the client predicted. If inputs
+        pile up, the oldest are skipped, keeping only their shots. With
+        none waiting the partner keeps moving as before.
+        """
+        if not self.inputs:
+            return
+        fire = 0
+        while len(self.inputs) > self.max_queued_inputs:
+            fire |= self.inputs.popleft()[1] & FIRE
+        self.applied_input, buttons = self.inputs.popleft()
+        self.partner.moving_left = bool(buttons & LEFT)
+        self.partner.moving_right = bool(buttons & RIGHT)
+        if (buttons | fire) & FIRE and self.ai_game.game_active:
+            self.ai_game._fire_bullet(self.partner)
+
+    def send_snapshot(self):
+        """Send this tick's state as a delta against the client's newest snapshot."""
+        tick = self.ai_game.ticks
+        record = self.layout.pack(self.ai_game)
+        self.records[tick] = record
+        if len(self.records) > self.history:
+            self.records.popitem(last=False)
+
+        baseline = self.records.get(self.snapshot_ack)
+        age = tick - self.snapshot_ack if baseline is not None else 0
+        packet = (KIND.pack(SNAPSHOT_KIND)
+                  + SNAPSHOT.pack(tick, age, self.applied_input)
+                  + encode_delta(record, baseline))
+        self.transport.send(packet)
+        self.snapshots_sent += 1
+        self.bytes_sent += len(packet)
+
+
+class CoopClient:
+    """A class to draw a co-op game hosted elsewhere and fly the partner's ship.
+
+    The client keeps an AlienInvasion of its own only to draw; it never
+    steps it, but copies each snapshot into it. The partner's ship is
+    predicted: it's placed where the host last had it, then moved by each
+    input the host hasn't applied yet.
+    """
+
+    history = 64
+    hello_interval = 10
+
+    def __init__(self, transport, headless=False, settings=None):
+        """Connect to the host over transport; the game is built once it answers."""
+        self.transport = transport
+        self.headless = headless
+        self.settings = settings or Settings()
+        self.ai_game = None
+        self.partner = None
+        self.layout = None
+        self.ticks = 0
+
+        # Unacknowledged inputs as (sequence, buttons, tick sent)
+        self.pending = deque()
+        self.sequence = 0
+        # Received records by tick, and the newest one's decoded state
+        self.records = OrderedDict()
+        self.latest_tick = 0
+        self.partner_x = None
+        self.input_ack = 0
+        self.predicted = {}
+
+        self.snapshots_received = 0
+        self.mispredictions = 0
+        self.max_error = 0.0
+        self.input_delays = []
+
+    def tick(self, buttons):
+        """Send this tick's buttons, take in new snapshots, and predict the partner."""
+        self.ticks += 1
+        for packet in self.transport.receive():
+            kind = packet[0]
+            if kind == WELCOME_KIND and self.ai_game is None:
+                self._start(*WELCOME.unpack_from(packet, 1))
+            elif kind == SNAPSHOT_KIND and self.ai_game is not None:
+                self._receive_snapshot(packet)
+
+        if self.ai_game is None:
+            if self.ticks % self.hello_interval == 1:
+                self.transport.send(KIND.pack(HELLO_KIND) + HELLO.pack(MAGIC, VERSION))
+            return
+
+        self.sequence += 1
+        self.pending.append((self.sequence, buttons, self.ticks))
+        # A packet holds at most 255 inputs; older ones are given up on.
+        while len(self.pending) > 255:
+            self.pending.popleft()
+
+        # Send every input the host hasn't applied, oldest first.
+        self.transport.send(KIND.pack(INPUT_KIND)
+                            + INPUT.pack(self.latest_tick, self.pending[0][0], len(self.pending))
+                            + bytes(entry[1] for entry in self.pending))
+        self._predict()
+
+        self.ai_game._update_crash_animation()
+        for shield in self.ai_game.shields:
+            shield.update()
+        self.ai_game.audio.flush()
+
+    def close(self):
+        """Tell the host this partner is leaving, and close the transport."""
+        self.transport.send(KIND.pack(BYE_KIND))
+        self.transport.close()
+
+    def _start(self, width, height, tick_rate, record_size):
+        """Build the game to draw into, set up like the host's."""
+        if (width, height) != (self.settings.screen_width, self.settings.screen_height):
+            self.settings.set_arena(width, height)
+        if tick_rate != self.settings.tick_rate:
+            self.settings.set_tick_rate(tick_rate)
+        self.ai_game = AlienInvasion(headless=self.headless, settings=self.settings)
+        self.partner = self.ai_game.add_partner()
+        self.partner_x = self.partner.x
+        self.layout = SnapshotLayout(self.ai_game)
+        if self.layout.size != record_size:
+            raise ValueError(f"host snapshots are {record_size} bytes, "
+                             f"this client expects {self.layout.size}")
+
+    def _receive_snapshot(self, packet):
+        """Decode a snapshot and, if it's the newest yet, show it."""
+        tick, age, input_ack = SNAPSHOT.unpack_from(packet, 1)
+        if tick <= self.latest_tick:
+            return
+        baseline = None
+        if age:
+            baseline = self.records.get(tick - age)
+            if baseline is None:
+                return
+        record = decode_delta(packet[1 + SNAPSHOT.size:], baseline)
+        self.records[tick] = record
+        if len(self.records) > self.history:
+            self.records.popitem(last=False)
+        self.latest_tick = tick
+        self.snapshots_received += 1
+        self._show(tick, input_ack, *self.layout.unpack(record))
+
+    def _show(self, tick, input_ack, state, alive, bullets, alien_bullets):
+        """Copy a snapshot's state into the game drawn here."""
+        game = self.ai_game
+        (flags, score, high_score, level, ships_left, shield_last_used, ship_x,
+         partner_x, ship_speed, fleet_dx, fleet_dy, shield_health) = state
+        game.ticks = tick
+        game.sim_time = tick * 1000 // game.settings.tick_rate
+        game.settings.ship_speed = ship_speed
+
+        stats = game.stats
+        if score > stats.score:
+            game.audio.play('explosion')
+        if (score, level) != (stats.score, stats.level):
+            stats.score, stats.level = score, level
+            game.sb.prep_score()
+        if high_score != stats.high_score:
+            stats.high_score = high_score
+            game.sb.prep_high_score()
+        if ships_left != stats.ships_left:
+            stats.ships_left = ships_left
+            game.sb.prep_ships()
+
+        game.game_active = bool(flags & ACTIVE)
+        game.crash_delay_active = bool(flags & CRASH_DELAY)
+        if flags & CRASHING and not game.ship_crashing:
+            game._start_ship_crash(self.partner if flags & PARTNER_CRASHED else None)
+        elif not flags & CRASHING and game.ship_crashing:
+            game.ship_crashing = False
+            game.crash_particles.clear()
+            game.ship_alpha = 255
+
+        game.ship.prev_x = game.ship.x
+        game.ship.x = ship_x
+        game.ship.rect.x = ship_x
+        game.fleet.place(game.fleet.formation(), fleet_dx, fleet_dy, alive)
+
+        game.shield_active = bool(flags & SHIELD_ACTIVE)
+        game.shield_last_used = game.shield_start_time = shield_last_used
+        if shield_health > 0:
+            if not game.shields:
+                game.shields.add(Shield(game, game.ship))
+            next(iter(game.shields)).health = shield_health
+        else:
+            game.shields.empty()
+
+        if len(bullets) > len(game.bullets):
+            game.audio.play('shoot')
+        _place_bullets(game.bullets, game.bullet_pool, bullets, game.ship)
+        _place_bullets(game.alien_bullets, game.alien_bullet_pool, alien_bullets,
+                       game.ship.rect)
+
+        # The partner's authoritative position, for the next prediction
+        self.partner_x = partner_x
+        if input_ack > self.input_ack:
+            self._check_prediction(input_ack, partner_x)
+            self.input_ack = input_ack
+
+    def _check_prediction(self, input_ack, partner_x):
+        """Compare where the partner was predicted to be after input_ack."""
+        predicted = self.predicted.pop(input_ack, None)
+        for sequence in [s for s in self.predicted if s < input_ack]:
+            del self.predicted[sequence]
+        if predicted is not None:
+            error = abs(predicted - partner_x)
+            self.max_error = max(self.max_error, error)
+            if error > 0.5:
+                self.mispredictions += 1
+        while self.pending and self.pending[0][0] <= input_ack:
+            sequence, _, sent = self.pending.popleft()
+            if sequence == input_ack:
+                self.input_delays.append(self.ticks - sent)
+
+    def _predict(self):
+        """Move the partner from its authoritative position by each pending input."""
+        partner = self.partner
+        previous = partner.x
+        partner.x = self.partner_x
+        partner.rect.x = partner.x
+        game = self.ai_game
+        moving = game.game_active and not game.crash_delay_active
+        for sequence, buttons, _ in self.pending:
+            if moving:
+                partner.moving_left = bool(buttons & LEFT)
+                partner.moving_right = bool(buttons & RIGHT)
+                partner.update()
+            self.predicted[sequence] = partner.x
+        partner.prev_x = previous
+
+
+def _place_bullets(group, pool, positions, *reset_args):
+    """Make group hold one bullet at each (x, y) in positions."""
+    bullets = group.sprites()
+    for bullet in bullets[len(positions):]:
+        bullet.kill()
+    for _ in range(len(bullets), len(positions)):
+        bullet = pool.acquire(*reset_args)
+        group.add(bullet)
+        bullets.append(bullet)
+    for bullet, (x, y) in zip(bullets, positions):
+        bullet.x = x
+        bullet.y = bullet.prev_y = float(y)
+
+
+def keyboard_buttons(held, fire):
+    """Return the buttons for the arrow keys held and whether fire was pressed."""
+    return ((LEFT if held[pygame.K_LEFT] else 0)
+            | (RIGHT if held[pygame.K_RIGHT] else 0)
+            | (FIRE if fire else 0))
+
+
+def loopback(ticks=1800, latency_ms=50, jitter_ms=10, loss=0.05, seed=0):
+    """Play a scripted co-op game over loopback sockets through LossyTransport.
+
+    Time is simulated, so the run is as fast as the machine allows.
+    Return a dict of results; 'corrupt' counts snapshots the client
+    decoded differently from what the host sent.
+    """
+    from batch import scripted_policy
+
+    now = [0.0]
+    clock = lambda: now[0]
+    host_transport = LossyTransport(UdpTransport(), latency_ms, jitter_ms, loss,
+                                    seed=[seed, 1], clock=clock)
+    client_transport = LossyTransport(UdpTransport(peer=host_transport.address),
+                                      latency_ms, jitter_ms, loss,
+                                      seed=[seed, 2], clock=clock)
+
+    game = AlienInvasion(headless=True, seed=seed)
+    host = CoopHost(game, host_transport)
+    client = CoopClient(client_transport, headless=True)
+    game.start_game()
+
+    rng = np.random.default_rng([seed, 3])
+    tick_ms = 1000 / game.settings.tick_rate
+    buttons = 0
+    corrupt = 0
+    host_time = 0.0
+    for tick in range(ticks):
+        now[0] += tick_ms
+        if tick % 6 == 0:
+            buttons = (LEFT, RIGHT, 0)[rng.integers(3)]
+        client.tick(buttons | (FIRE if rng.random() < 0.2 else 0))
+
+        scripted_policy(game, rng)
+        start = perf_counter()
+        host.step()
+        host_time += perf_counter() - start
+
+        # Every snapshot the client shows must match what the host sent.
+        if client.latest_tick and client.latest_tick in host.records:
+            if client.records[client.latest_tick] != host.records[client.latest_tick]:
+                corrupt += 1
+        if not game.game_active:
+            game.start_game()
+
+    full = len(encode_delta(host.layout.pack(game)))
+    results = {
+        'ticks': ticks,
+        'snapshots_sent': host.snapshots_sent,
+        'snapshots_received': client.snapshots_received,
+        'dropped': host_transport.dropped + client_transport.dropped,
+        'record_bytes': host.layout.size,
+        'full_snapshot_bytes': SNAPSHOT.size + 1 + full,
+        'mean_snapshot_bytes': host.bytes_sent / max(1, host.snapshots_sent),
+        'downstream_kbps': host.bytes_sent * 8 / (ticks * tick_ms),
+        'input_delay_ms': (np.mean(client.input_delays) * tick_ms
+                           if client.input_delays else float('nan')),
+        'mispredictions': client.mispredictions,
+        'max_prediction_error': client.max_error,
+        'host_tick_ms': host_time * 1000 / ticks,
+        'corrupt': corrupt,
+    }
+    client.close()
+    host_transport.close()
+    return results
+
+
+def _address(text):
+    """Parse a HOST:PORT argument."""
+    host, _, port = text.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {text!r}")
+
+
+def _network(parser):
+    """Add the simulated network options to parser."""
+    parser.add_argument('--latency', type=float, default=0, metavar='MS',
+                        help="add this one-way delay to every packet sent")
+    parser.add_argument('--jitter', type=float, default=0, metavar='MS',
+                        help="add up to this much more delay at random")
+    parser.add_argument('--loss', type=float, default=0,
+                        help="drop this fraction of the packets sent")
+
+
+def _wrap(transport, args):
+    """Put transport behind a LossyTransport if args ask for a bad network."""
+    if args.latency or args.jitter or args.loss:
+        return LossyTransport(transport, args.latency, args.jitter, args.loss)
+    return transport
+
+
+def run_host(args):
+    """Play Alien Invasion with a partner joining at args.port."""
+    ai_game = AlienInvasion()
+    transport = _wrap(UdpTransport(('0.0.0.0', args.port)), args)
+    CoopHost(ai_game, transport)
+    print(f"Hosting on port {transport.address[1]}; click Play to start.")
+    ai_game.run_game()
+
+
+def run_join(args):
+    """Join the game hosted at args.address as the second ship."""
+    client = CoopClient(_wrap(UdpTransport(('0.0.0.0', 0), peer=args.address), args))
+    clock = pygame.time.Clock()
+    print(f"Joining {args.address[0]}:{args.address[1]}...")
+    while client.ai_game is None:
+        client.tick(0)
+        clock.tick(client.settings.tick_rate)
+
+    while True:
+        fire = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                             and event.key == pygame.K_q):
+                client.close()
+                client.ai_game._quit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                fire = True
+        client.tick(keyboard_buttons(pygame.key.get_pressed(), fire))
+        client.ai_game._update_screen()
+        clock.tick(client.settings.tick_rate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Alien Invasion co-op over the network.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    host = commands.add_parser('host', help="play, with a partner joining over the network")
+    host.add_argument('--port', type=int, default=DEFAULT_PORT)
+    _network(host)
+
+    join = commands.add_parser('join', help="join a hosted game as the second ship")
+    join.add_argument('address', type=_address, metavar='HOST:PORT')
+    _network(join)
+
+    check = commands.add_parser('loopback', help="check a scripted session over loopback")
+    check.add_argument('-n', '--ticks', type=int, default=1800)
+    check.add_argument('--seed', type=int, default=0)
+    check.add_argument('--latency', type=float, default=50, metavar='MS')
+    check.add_argument('--jitter', type=float, default=10, metavar='MS')
+    check.add_argument('--loss', type=float, default=0.05)
+
+    args = parser.parse_args(argv)
+    if args.command == 'host':
+        run_host(args)
+    elif args.command == 'join':
+        run_join(args)
+    else:
+        results = loopback(args.ticks, args.latency, args.jitter, args.loss, args.seed)
+        for name, value in results.items():
+            print(f"{name:>22}: {value:.2f}" if isinstance(value, float)
+                  else f"{name:>22}: {value}")
+        return 1 if results['corrupt'] or not results['snapshots_received'] else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import numpy as np
+import pygame
+
+
+# Fiery palette used for ship crash explosions.
+EXPLOSION_COLORS = [(255, 80, 0), (255, 180, 0), (255, 255, 80), (255, 0, 0),
+                    (255, 120, 20), (255, 255, 255), (200, 50, 0), (255, 200, 100)]
+
+
+class ParticleSystem:
+    """A class to simulate explosion particles in preallocated NumPy arrays.
+
+    Live particles are packed into the first `count` slots. Dead particles
+    are swap-removed with the last live ones, so updates and removals stay
+    vectorized however many particles are alive.
+    """
+
+    def __init__(self, capacity=4096, gravity=0.1, drag=0.985, seed=None):
+        """Allocate storage for up to capacity live particles."""
+        self.capacity = capacity
+        self.gravity = gravity
+        self.drag = drag
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vel_x = np.zeros(capacity)
+        self.vel_y = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.int32)
+        self._arrays = (self.x, self.y, self.vel_x, self.vel_y,
+                        self.life, self.max_life, self.size, self.color)
+
+    def __len__(self):
+        """Return the number of live particles."""
+        return self.count
+
+    def clear(self):
+        """Remove every particle."""
+        self.count = 0
+
+    def emit(self, position, amount, colors=EXPLOSION_COLORS):
+        """Burst up to amount new particles outward from position."""
+        start = self.count
+        end = min(self.capacity, start + amount)
+        n = end - start
+        if n <= 0:
+            return
+        rng = self.rng
+
+        self.x[start:end] = position[0]
+        self.y[start:end] = position[1]
+        speed = rng.uniform(3, 8, n)
+        self.vel_x[start:end] = speed * rng.uniform(-1, 1, n) * 2  # Wider spread
+        self.vel_y[start:end] = speed * rng.uniform(-1, 1, n) * 2
+        self.color[start:end] = np.asarray(colors)[rng.integers(len(colors), size=n)]
+        self.life[start:end] = rng.integers(60, 121, n)
+        self.max_life[start:end] = rng.integers(60, 121, n)
+        self.size[start:end] = rng.integers(3, 9, n)
+        self.count = end
+
+    def update(self, dt=1.0):
+        """Integrate motion, gravity and drag, then drop expired particles.
+
+        dt is the step length in 1/60 s frames; velocities and lives are
+        measured in those frames.
+        """
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vel_x[:n] * dt
+        self.y[:n] += self.vel_y[:n] * dt
+        self.vel_y[:n] += self.gravity * dt
+        self.vel_x[:n] *= self.drag ** dt
+        self.life[:n] -= dt
+
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if len(dead):
+            self._swap_remove(dead)
+
+    def _swap_remove(self, dead):
+        """Fill the dead slots below the new count with live tail particles."""
+        new_count = self.count - len(dead)
+        holes = dead[dead < new_count]
+        tail = np.arange(new_count, self.count)
+        movers = tail[self.life[new_count:self.count] > 0]
+        for array in self._arrays:
+            array[holes] = array[movers]
+        self.count = new_count
+
+    def draw(self, surface):
+        """Draw every live particle, and return the rects drawn."""
+        n = self.count
+        if not n:
+            return []
+        ratio = np.maximum(0, self.life[:n] / self.max_life[:n])
+        sizes = np.maximum(1, (self.size[:n] * ratio).astype(int))
+        colors = np.clip((self.color[:n] * ratio[:, None]).astype(int), 0, 255)
+        visible = colors.sum(axis=1) > 0
+
+        drawn = []
+        for x, y, color, size in zip(self.x[:n][visible].astype(int).tolist(),
+                                     self.y[:n][visible].astype(int).tolist(),
+                                     colors[visible].tolist(),
+                                     sizes[visible].tolist()):
+            drawn.append(pygame.draw.circle(surface, color, (x, y), size))
+        return drawn
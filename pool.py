@@ -0,0 +1,42 @@
+class SpritePool:
+    """A pool of reusable sprites that return to it when they're killed.
+
+    The pool is prewarmed with capacity sprites. acquire() hands one out
+    after calling its reset() with the given arguments; the sprite's
+    kill() gives it back. If a burst needs more than capacity the pool
+    builds another sprite rather than dropping the shot, and keeps it.
+    """
+
+    def __init__(self, factory, capacity):
+        """Prewarm the pool with capacity sprites built by factory()."""
+        self.factory = factory
+        self.free = [self._create() for _ in range(capacity)]
+
+    def _create(self):
+        """Build a new sprite that belongs to this pool."""
+        sprite = self.factory()
+        sprite.pool = self
+        return sprite
+
+    def acquire(self, *args):
+        """Return a free sprite, reset with args."""
+        sprite = self.free.pop() if self.free else self._create()
+        sprite.reset(*args)
+        return sprite
+
+    def release(self, sprite):
+        """Take back a sprite that has left the game."""
+        self.free.append(sprite)
+
+    def release_all(self, group):
+        """Kill every sprite in group, returning each one to its pool.
+
+        Sprites with a kill_all(), such as entity sprites, are killed in
+        one batch through it.
+        """
+        sprites = group.sprites()
+        if sprites and hasattr(sprites[0], 'kill_all'):
+            sprites[0].kill_all(sprites)
+        else:
+            for sprite in sprites:
+                sprite.kill()
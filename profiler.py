@@ -0,0 +1,180 @@
+import atexit
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+from assets import Assets
+
+
+class FrameProfiler:
+    """A class to time each phase of a frame, with an overlay and export.
+
+    When enabled, the profiled methods are shadowed on their instances by
+    timing wrappers; disabling removes the wrappers again, so a disabled
+    profiler costs nothing beyond one flag check per frame. The export file
+    is opened on the first enable and kept until exit, so toggling the
+    profiler appends to it instead of starting it over.
+    """
+
+    # (phase name, attribute path from the game) in display order; the
+    #   collision passes are nested inside _update_bullets.
+    phases = [
+        ('events', '_check_events'),
+        ('ship', 'ship.update'),
+        ('bullets', '_update_bullets'),
+        ('  alien bullets/ship', '_check_alien_bullet_ship_collision'),
+        ('  bullets/aliens', '_check_bullet_alien_collisions'),
+        ('  bullets/shields', '_check_bullet_shield_collisions'),
+        ('  alien bullets/shields', '_check_alien_bullet_shield_collisions'),
+        ('aliens', '_update_aliens'),
+        ('shield skill', '_update_shield_skill'),
+        ('crash animation', '_update_crash_animation'),
+        ('render', '_update_screen'),
+        ('  hud', 'sb.show_score'),
+    ]
+
+    def __init__(self, ai_game, window=120, export_path=None):
+        """Initialize a disabled profiler keeping window frames of history."""
+        self.ai_game = ai_game
+        self.window = window
+        self.export_path = export_path
+        self.enabled = False
+
+        self.frame = 0
+        self.current = {}
+        self.history = {name: deque(maxlen=window) for name, _ in self.phases}
+        self.frame_times = deque(maxlen=window)
+        self._frame_start = None
+        self._wrapped = []
+        self._export_file = None
+        self._writer = None
+
+        self.font = Assets.font(None, 22)
+        self.text_color = (255, 255, 255)
+        self.bg_color = (0, 0, 0, 170)
+
+    def toggle(self):
+        """Turn profiling and its overlay on or off."""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def enable(self):
+        """Wrap every phase in a timer and start exporting if configured."""
+        if self.enabled:
+            return
+        for name, path in self.phases:
+            owner, attr = self._resolve(path)
+            self._wrap(owner, attr, name)
+        if self.export_path and self._export_file is None:
+            self._open_export()
+        self.enabled = True
+        self._frame_start = perf_counter()
+
+    def disable(self):
+        """Remove the timing wrappers and flush what's been exported."""
+        if not self.enabled:
+            return
+        for owner, attr in self._wrapped:
+            delattr(owner, attr)
+        self._wrapped.clear()
+        if self._export_file is not None:
+            self._export_file.flush()
+        self.enabled = False
+
+    def end_frame(self):
+        """Record the phase timings of the frame that just finished."""
+        now = perf_counter()
+        frame_ms = (now - self._frame_start) * 1000
+        self._frame_start = now
+
+        self.frame += 1
+        self.frame_times.append(frame_ms)
+        for name, _ in self.phases:
+            self.history[name].append(self.current.get(name, 0.0))
+
+        if self._writer is not None:
+            record = {'frame': self.frame, 'frame_ms': round(frame_ms, 4)}
+            for name, _ in self.phases:
+                record[name.strip()] = round(self.current.get(name, 0.0), 4)
+            self._writer(record)
+        self.current.clear()
+
+    def averages(self):
+        """Return the rolling mean and max ms of each phase."""
+        stats = {}
+        for name, _ in self.phases:
+            samples = self.history[name]
+            if samples:
+                stats[name] = (sum(samples) / len(samples), max(samples))
+            else:
+                stats[name] = (0.0, 0.0)
+        return stats
+
+    def draw(self, screen):
+        """Draw the rolling timings overlay, and return its rect."""
+        lines = []
+        if self.frame_times:
+            mean_frame = sum(self.frame_times) / len(self.frame_times)
+            lines.append(f"frame {mean_frame:6.2f} ms  ({1000 / max(mean_frame, 1e-6):5.0f} fps)")
+        for name, (mean, peak) in self.averages().items():
+            lines.append(f"{name:<24}{mean:6.2f} avg {peak:6.2f} max")
+
+        images = [Assets.text(self.font, line, self.text_color) for line in lines]
+        width = max(image.get_width() for image in images) + 16
+        height = sum(image.get_height() for image in images) + 16
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(self.bg_color)
+        y = 8
+        for image in images:
+            panel.blit(image, (8, y))
+            y += image.get_height()
+        return screen.blit(panel, (10, 80))
+
+    def _resolve(self, path):
+        """Return the (owner, attribute) a dotted phase path refers to."""
+        owner = self.ai_game
+        *parents, attr = path.split('.')
+        for parent in parents:
+            owner = getattr(owner, parent)
+        return owner, attr
+
+    def _wrap(self, owner, attr, name):
+        """Shadow owner.attr with a wrapper that adds its time to name."""
+        original = getattr(owner, attr)
+        current = self.current
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                current[name] = current.get(name, 0.0) + (perf_counter() - start) * 1000
+
+        setattr(owner, attr, timed)
+        self._wrapped.append((owner, attr))
+
+    def _open_export(self):
+        """Start writing per-frame records as CSV, or JSON lines otherwise."""
+        self._export_file = open(self.export_path, 'w', newline='')
+        if self.export_path.endswith('.csv'):
+            fields = ['frame', 'frame_ms'] + [name.strip() for name, _ in self.phases]
+            writer = csv.DictWriter(self._export_file, fieldnames=fields)
+            writer.writeheader()
+            self._writer = writer.writerow
+        else:
+            export_file = self._export_file
+            self._writer = lambda record: export_file.write(json.dumps(record) + '\n')
+        atexit.register(self._close_export)
+
+    def _close_export(self):
+        """Flush and close the export file, if one is open."""
+        if self._export_file is not None:
+            self._export_file.close()
+            atexit.unregister(self._close_export)
+        self._export_file = None
+        self._writer = None
@@ -0,0 +1,102 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """A class to redraw and push only the screen regions that changed.
+
+    Each frame erases the rects drawn last frame back to the background,
+    the game draws as usual, and only the old and new rects are sent to
+    the display. When too much of the screen is dirty it falls back to a
+    full fill and flip.
+    """
+
+    def __init__(self, screen, bg_color, full_threshold=0.5):
+        """Initialize the renderer for screen."""
+        self.screen = screen
+        self.bg_color = bg_color
+        self.full_threshold = full_threshold
+        self.screen_area = screen.get_width() * screen.get_height()
+
+        # Rects drawn in the last presented frame; None forces a full frame.
+        self.previous = None
+
+    def invalidate(self):
+        """Force the next frame to be filled and flipped in full."""
+        self.previous = None
+
+    def begin_frame(self):
+        """Erase everything the last frame drew."""
+        if self.previous is None:
+            self.screen.fill(self.bg_color)
+        else:
+            for rect in self.previous:
+                self.screen.fill(self.bg_color, rect)
+
+    def present(self, drawn, push=True):
+        """Push the rects that changed this frame to the display.
+
+        With push=False the rects are only remembered for the next erase,
+        for callers that put the screen on the display themselves.
+        """
+        drawn = [rect for rect in drawn if rect]
+        if push:
+            self._push(drawn)
+        self.previous = drawn
+
+    def _push(self, drawn):
+        """Update the display where last frame's or this frame's rects are."""
+        if self.previous is None:
+            pygame.display.flip()
+            return
+        dirty = self.previous + drawn
+        dirty_area = sum(rect.width * rect.height for rect in dirty)
+        if dirty_area > self.full_threshold * self.screen_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+
+class ScaledPresenter:
+    """A class to show the logical playfield surface scaled to the window.
+
+    The game draws to a surface of the playfield's size; present() scales
+    it into the largest rect of the same aspect ratio that fits the
+    window, leaving black bars around it, and flips.
+    """
+
+    # Scaling backends: 'smooth' filters, 'fast' picks nearest pixels.
+    scalers = {
+        'smooth': pygame.transform.smoothscale,
+        'fast': pygame.transform.scale,
+    }
+
+    def __init__(self, surface, window, scaler='smooth'):
+        """Initialize the presenter for surface shown on window."""
+        if scaler not in self.scalers:
+            raise ValueError(f"unknown scaler {scaler!r}; "
+                             f"choose from {', '.join(self.scalers)}")
+        self.surface = surface
+        self.scale = self.scalers[scaler]
+        self.resize(window)
+
+    def resize(self, window):
+        """Fit the playfield to window, e.g. after the window was resized."""
+        self.window = window
+        width, height = self.surface.get_size()
+        factor = min(window.get_width() / width, window.get_height() / height)
+        self.view_rect = pygame.Rect(0, 0, max(1, int(width * factor)),
+                                     max(1, int(height * factor)))
+        self.view_rect.center = window.get_rect().center
+        self.view = window.subsurface(self.view_rect)
+        window.fill((0, 0, 0))
+
+    def to_logical(self, pos):
+        """Map a window position, such as a click, to playfield coordinates."""
+        x = (pos[0] - self.view_rect.x) * self.surface.get_width() / self.view_rect.width
+        y = (pos[1] - self.view_rect.y) * self.surface.get_height() / self.view_rect.height
+        return int(x), int(y)
+
+    def present(self):
+        """Scale the playfield into the window and flip."""
+        self.scale(self.surface, self.view_rect.size, self.view)
+        pygame.display.flip()
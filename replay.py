@@ -0,0 +1,154 @@
+"""Record play sessions and replay them headlessly at maximum speed.
+
+    python main.py --record session.air     # play and record a session
+    python replay.py session.air            # replay it and check the result
+
+A session file holds the RNG seed, the tick rate, the playfield size
+and every input event the game handled, stamped with the simulation tick it was handled on.
+Since the simulation only depends on those, a replay reproduces the
+original score, level and outcome.
+"""
+import atexit
+import struct
+import sys
+from time import perf_counter
+
+import pygame
+
+from main import AlienInvasion
+from settings import Settings
+
+
+MAGIC = b'AIRP'
+VERSION = 2
+HEADER = struct.Struct('<4sBQHHH')   # magic, version, seed, tick rate, width, height
+EVENT = struct.Struct('<IB')         # tick, kind
+KEY = struct.Struct('<i')            # key code
+CLICK = struct.Struct('<hh')         # mouse position
+END = struct.Struct('<qiiB')         # score, level, ships left, game active
+
+KEYDOWN, KEYUP, CLICK_EVENT, END_EVENT = 1, 2, 3, 4
+PAYLOADS = {KEYDOWN: KEY, KEYUP: KEY, CLICK_EVENT: CLICK, END_EVENT: END}
+
+
+class SessionRecorder:
+    """A class to stream a game's seed and input events to a file."""
+
+    def __init__(self, path, ai_game):
+        """Open path and write the session header."""
+        self.ai_game = ai_game
+        self.file = open(path, 'wb')
+        settings = ai_game.settings
+        self.file.write(HEADER.pack(MAGIC, VERSION, ai_game.seed, settings.tick_rate,
+                                    settings.screen_width, settings.screen_height))
+        atexit.register(self.close)
+
+    def record(self, event):
+        """Write event if it's one the game responds to."""
+        tick = self.ai_game.ticks
+        if event.type == pygame.KEYDOWN:
+            self._write(tick, KEYDOWN, event.key)
+        elif event.type == pygame.KEYUP:
+            self._write(tick, KEYUP, event.key)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._write(tick, CLICK_EVENT, *event.pos)
+
+    def close(self):
+        """Write the final result and close the file."""
+        if self.file.closed:
+            return
+        game = self.ai_game
+        self._write(game.ticks, END_EVENT, game.stats.score, game.stats.level,
+                    game.stats.ships_left, game.game_active)
+        self.file.close()
+        atexit.unregister(self.close)
+
+    def _write(self, tick, kind, *values):
+        """Append one event record."""
+        self.file.write(EVENT.pack(tick, kind))
+        self.file.write(PAYLOADS[kind].pack(*values))
+
+
+def read_session(path):
+    """Return (seed, tick_rate, (width, height), events) from a session file.
+
+    Each event is a (tick, kind, values) tuple.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, tick_rate, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} session file")
+
+    events = []
+    offset = HEADER.size
+    while offset < len(data):
+        tick, kind = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        payload = PAYLOADS[kind]
+        events.append((tick, kind, payload.unpack_from(data, offset)))
+        offset += payload.size
+    return seed, tick_rate, (width, height), events
+
+
+def result_of(game):
+    """Return the (score, level, ships left, game active) of game."""
+    return (game.stats.score, game.stats.level, game.stats.ships_left,
+            int(game.game_active))
+
+
+def replay(path):
+    """Re-run a recorded session headlessly, as fast as possible.
+
+    Return (replayed result, recorded result); the recorded result is
+    None if the session was cut off before it ended.
+    """
+    seed, tick_rate, arena, events = read_session(path)
+    settings = Settings()
+    if arena != (settings.screen_width, settings.screen_height):
+        settings.set_arena(*arena)
+    settings.set_tick_rate(tick_rate)
+    game = AlienInvasion(headless=True, seed=seed, settings=settings)
+
+    for tick, kind, values in events:
+        while game.ticks < tick:
+            game.step()
+
+        if kind == KEYDOWN:
+            # Quitting ends the session; it's followed by the end record.
+            if values[0] != pygame.K_q:
+                game._check_keydown_events(pygame.event.Event(pygame.KEYDOWN, key=values[0]))
+        elif kind == KEYUP:
+            game._check_keyup_events(pygame.event.Event(pygame.KEYUP, key=values[0]))
+        elif kind == CLICK_EVENT:
+            game._check_play_button(values)
+        elif kind == END_EVENT:
+            return result_of(game), tuple(values)
+    return result_of(game), None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python replay.py SESSION_FILE")
+        return 2
+
+    start = perf_counter()
+    replayed, recorded = replay(argv[0])
+    elapsed = perf_counter() - start
+    score, level, ships_left, active = replayed
+    print(f"score {score}, level {level}, ships left {ships_left}, "
+          f"{'still playing' if active else 'game over'} ({elapsed:.2f}s)")
+
+    if recorded is None:
+        print("Session has no end record; nothing to compare against.")
+        return 0
+    if replayed != recorded:
+        print(f"MISMATCH: recorded {recorded}, replayed {replayed}")
+        return 1
+    print("Replay matches the recorded session.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
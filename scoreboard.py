@@ -1,8 +1,15 @@
-import pygame.font
-from ship import Ship
+import pygame
+from assets import Assets
 
 class Scoreboard:
-    """A class to report scoring information."""
+    """A class to report scoring information.
+
+    The HUD is kept as a few cached layers: score and level on the right,
+    the high score in the center, the ships left on the left, and the
+    shield status at the bottom. The prep_* methods only mark a layer
+    dirty; show_score() rebuilds dirty layers once before drawing, so
+    several kills in one frame cost one re-render.
+    """
 
     def __init__(self, ai_game):
         """Initialize scorekeeping attributes."""
@@ -14,60 +21,114 @@ class Scoreboard:
 
         # Font settings
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = Assets.font(None, 48)
+        self.shield_font = Assets.font(None, 36)
+        self.ship_image = Assets.image('images/ship.bmp')
 
-        # Prepare the initial score image
-        self.prep_score()
-        self.prep_high_score()
-        self.prep_level()
-        self.prep_ships()
+        # Layer name -> (surface, rect); None for an empty layer.
+        self.layers = {}
+        self.dirty = {'score', 'high_score', 'ships'}
+        self.shield_status = None
 
     def prep_score(self):
-        """Turn the score into a rendered image."""
-        score_str = f"Score: {self.stats.score}"
-        self.score_image = self.font.render(score_str, True, self.text_color)
-
-        # Display the score at the top right of the screen
-        self.score_rect = self.score_image.get_rect()
-        self.score_rect.right = self.screen_rect.right - 20
-        self.score_rect.top = 20
+        """Mark the score for re-rendering."""
+        self.dirty.add('score')
 
     def prep_level(self):
-        """Turn the level into a rendered image."""
-        level_str = f"Level: {self.stats.level}"
-        self.level_image = self.font.render(level_str, True, self.text_color)
-
-        # Position the level on the right side below score
-        self.level_rect = self.level_image.get_rect()
-        self.level_rect.right = self.screen_rect.right - 20
-        self.level_rect.top = self.score_rect.bottom + 10
+        """Mark the level, drawn with the score, for re-rendering."""
+        self.dirty.add('score')
 
     def prep_ships(self):
-        """Show how many ships are left."""
-        self.ships = pygame.sprite.Group()
-        for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * (ship.rect.width)
-            ship.rect.y = 10
-            self.ships.add(ship)
-
+        """Mark the ships left for re-rendering."""
+        self.dirty.add('ships')
 
     def prep_high_score(self):
-        """Turn the high score into a rendered image."""
+        """Mark the high score for re-rendering."""
+        self.dirty.add('high_score')
+
+    def _render_score(self):
+        """Render the score with the level below it, at the top right."""
+        score_image = Assets.text(self.font, f"Score: {self.stats.score}", self.text_color)
+        level_image = Assets.text(self.font, f"Level: {self.stats.level}", self.text_color)
+
+        # Right-align both; the level sits 10 pixels below the score.
+        width = max(score_image.get_width(), level_image.get_width())
+        height = score_image.get_height() + 10 + level_image.get_height()
+        layer = pygame.Surface((width, height), pygame.SRCALPHA)
+        layer.blit(score_image, score_image.get_rect(topright=(width, 0)))
+        layer.blit(level_image, level_image.get_rect(
+            topright=(width, score_image.get_height() + 10)))
+
+        rect = layer.get_rect()
+        rect.right = self.screen_rect.right - 20
+        rect.top = 20
+        return layer, rect
+
+    def _render_high_score(self):
+        """Render the high score, centered at the top."""
         high_score_str = f"High Score: {self.stats.high_score}"
-        self.high_score_image = self.font.render(high_score_str, True, self.text_color)
+        layer = Assets.text(self.font, high_score_str, self.text_color)
+        rect = layer.get_rect()
+        rect.centerx = self.screen_rect.centerx
+        rect.top = 20
+        return layer, rect
+
+    def _render_ships(self):
+        """Render a row of ships, one for each ship left, at the top left."""
+        if self.stats.ships_left <= 0:
+            return None
+        width, height = self.ship_image.get_size()
+        layer = pygame.Surface((width * self.stats.ships_left, height)).convert()
+        for ship_number in range(self.stats.ships_left):
+            layer.blit(self.ship_image, (ship_number * width, 0))
+        return layer, layer.get_rect(topleft=(10, 10))
+
+    def _shield_status(self):
+        """Return the shield skill's status text and color."""
+        ai_game = self.ai_game
+        current_time = ai_game.sim_time
 
-        # Center the high score
-        self.high_score_rect = self.high_score_image.get_rect()
-        self.high_score_rect.centerx = self.screen_rect.centerx
-        self.high_score_rect.top = 20
+        # Calculate cooldown remaining
+        cooldown_remaining = max(0, self.settings.shield_cooldown
+                                 - (current_time - ai_game.shield_last_used))
+
+        if ai_game.shield_active:
+            # Show duration remaining
+            duration_remaining = max(0, self.settings.shield_duration
+                                     - (current_time - ai_game.shield_start_time))
+            return f"Shield: {duration_remaining // 1000 + 1}s", (0, 255, 0)  # Green when active
+        elif cooldown_remaining > 0:
+            # Show cooldown
+            return f"Shield: {cooldown_remaining // 1000 + 1}s", (255, 0, 0)  # Red when on cooldown
+        # Ready to use
+        return "Shield: Ready [Ctrl]", (255, 255, 255)  # White when ready
+
+    def _render_shield(self):
+        """Render the shield skill status at the bottom left."""
+        text, color = self.shield_status
+        layer = Assets.text(self.shield_font, text, color)
+        rect = layer.get_rect()
+        rect.left = self.screen_rect.left + 20
+        rect.bottom = self.screen_rect.bottom - 50
+        return layer, rect
 
     def show_score(self):
-        """Draw score and other info to the screen."""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+        """Draw the HUD layers, rebuilding changed ones, and return the rects drawn."""
+        # The shield countdown only changes layer once a second.
+        shield_status = self._shield_status()
+        if shield_status != self.shield_status:
+            self.shield_status = shield_status
+            self.dirty.add('shield')
+
+        if self.dirty:
+            renderers = {'score': self._render_score, 'high_score': self._render_high_score,
+                         'ships': self._render_ships, 'shield': self._render_shield}
+            for name in self.dirty:
+                self.layers[name] = renderers[name]()
+            self.dirty.clear()
+
+        return [self.screen.blit(layer, rect)
+                for layer, rect in filter(None, self.layers.values())]
 
     def check_high_score(self):
         """Check and update the high score if needed."""
@@ -8,6 +8,27 @@ class Settings:
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
 
+        # Window size the playfield is scaled to (None: the playfield's own
+        #   size, shrunk to fit the desktop), and the scaler used: 'smooth'
+        #   or 'fast' (nearest neighbour).
+        self.window_size = None
+        self.scaler = 'smooth'
+
+        # Dirty-rect rendering: redraw only changed regions, falling back to
+        #   a full flip when more than this fraction of the screen changed.
+        self.dirty_rect_rendering = False
+        self.dirty_rect_threshold = 0.5
+
+        # Simulation ticks per second. Speeds are given in pixels per 1/60 s
+        #   and scaled by tick_scale, so game speed doesn't depend on it.
+        self.set_tick_rate(60)
+
+        # Rendered frames per second (0 means uncapped, None the display's
+        #   refresh rate), and the most ticks simulated per rendered frame
+        #   before gameplay is allowed to slow.
+        self.max_fps = None
+        self.max_ticks_per_frame = 8
+
         # Ship settings
         self.ship_speed = 3.0  # Increased from 1.5
         self.ship_limit = 3
@@ -31,6 +52,29 @@ class Settings:
         self.alien_speed = 2.0  # Increased from 1.0
         self.fleet_drop_speed = 20  # Increased from 10
 
+        # Frame profiler: start with it on, and where to write per-frame
+        #   records (.csv for CSV, anything else for JSON lines).
+        self.profiling = False
+        self.profile_export_path = None
+
+        # Collision settings: spatial hash cell size in pixels
+        self.collision_cell_size = 128
+
+        # Most explosion particles alive at once
+        self.particle_capacity = 4096
+
+        # Audio: mixer channels reserved per sound category (their sum caps
+        #   the voices playing at once), and the game time in ms within
+        #   which repeats of one sound are merged into a single play.
+        self.sound_channels = {'shoot': 2, 'explosion': 3}
+        self.sound_coalesce_ms = 50
+
+        # High score file, the leaderboard database, and how long the score
+        #   must stay unchanged before the high score file is rewritten.
+        self.high_score_path = 'high_score.json'
+        self.leaderboard_path = 'leaderboard.db'
+        self.high_score_save_delay = 1.0
+
         # Shield skill settings
         self.shield_duration = 8000  # 8 seconds duration
         self.shield_cooldown = 3000  # 3 seconds cooldown (shorter for testing)
@@ -40,6 +84,24 @@ class Settings:
         self.speedup_scale = 1.2  # Increased from 1.1 for faster progression
         self.initialize_dynamic_settings()
 
+    def set_arena(self, width, height):
+        """Make the playfield width x height pixels for large-scale runs.
+
+        The fleet fills whatever playfield it's given, so a 4K or 8K arena
+        holds hundreds to thousands of aliens. The alien bullet cap grows
+        with the area so the larger fleet isn't held back by it.
+        """
+        area_scale = width * height / (self.screen_width * self.screen_height)
+        self.screen_width = width
+        self.screen_height = height
+        self.alien_bullets_allowed = max(self.alien_bullets_allowed,
+                                         round(self.alien_bullets_allowed * area_scale))
+
+    def set_tick_rate(self, tick_rate):
+        """Set the simulation rate and the matching per-tick speed scale."""
+        self.tick_rate = tick_rate
+        self.tick_scale = 60 / tick_rate
+
     def initialize_dynamic_settings(self):
         """Initialize settings that change through the game."""
         self.ship_speed = 3.0  # Increased from 1.5
@@ -1,15 +1,45 @@
 import pygame
 from pygame.sprite import Sprite
 import math
+from collections import OrderedDict
+
+
+class ShieldFrameCache:
+    """An LRU cache of pre-rendered shield frames and particle dots."""
+
+    def __init__(self, max_frames=128):
+        """Initialize an empty cache holding at most max_frames surfaces."""
+        self.max_frames = max_frames
+        self.frames = OrderedDict()
+
+    def get(self, key):
+        """Return the cached surface for key, or None."""
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+        return frame
+
+    def put(self, key, frame):
+        """Store frame, evicting the least recently used one when full."""
+        self.frames[key] = frame
+        if len(self.frames) > self.max_frames:
+            self.frames.popitem(last=False)
+
 
 class Shield(Sprite):
     """A class to represent a shield that protects the ship."""
 
+    # The pulse cycle and health alpha are quantized so frames can be reused.
+    pulse_steps = 32
+    alpha_step = 16
+    frame_cache = ShieldFrameCache()
+
     def __init__(self, ai_game, ship):
         """Initialize the shield and set its starting position."""
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
+        self.ai_game = ai_game
         self.ship = ship  # Reference to ship for following
         
         # Shield dimensions and appearance
@@ -30,6 +60,7 @@ class Shield(Sprite):
         # Visual effects
         self.alpha = 180  # Semi-transparent
         self.energy_particles = []
+        self.free_particles = [{} for _ in range(12)]  # Recycled particle dicts
         
     def update_position(self):
         """Update shield position to follow the ship."""
@@ -39,7 +70,7 @@ class Shield(Sprite):
     def update(self):
         """Update shield animation and position."""
         self.update_position()
-        self.pulse_offset += self.pulse_speed
+        self.pulse_offset += self.pulse_speed * self.settings.tick_scale
         
         # Update energy particles
         self.update_particles()
@@ -47,21 +78,26 @@ class Shield(Sprite):
     def update_particles(self):
         """Update energy particles around the shield."""
         # Add new particles occasionally
-        if len(self.energy_particles) < 12 and pygame.time.get_ticks() % 5 == 0:
-            angle = pygame.time.get_ticks() * 0.01 + len(self.energy_particles) * 0.5
-            particle = {
-                'angle': angle,
-                'distance': self.radius - 15,
-                'life': 30
-            }
+        current_time = self.ai_game.sim_time
+        if len(self.energy_particles) < 12 and current_time % 5 == 0:
+            angle = current_time * 0.01 + len(self.energy_particles) * 0.5
+            particle = self.free_particles.pop() if self.free_particles else {}
+            particle['angle'] = angle
+            particle['distance'] = self.radius - 15
+            particle['life'] = 30
             self.energy_particles.append(particle)
             
-        # Update existing particles
-        for particle in self.energy_particles[:]:
-            particle['angle'] += 0.05
-            particle['life'] -= 1
-            if particle['life'] <= 0:
-                self.energy_particles.remove(particle)
+        # Update existing particles, compacting the live ones in place
+        live = 0
+        for particle in self.energy_particles:
+            particle['angle'] += 0.05 * self.settings.tick_scale
+            particle['life'] -= self.settings.tick_scale
+            if particle['life'] > 0:
+                self.energy_particles[live] = particle
+                live += 1
+            else:
+                self.free_particles.append(particle)
+        del self.energy_particles[live:]
 
     def hit(self, damage=20):
         """Reduce shield health and create damage effect."""
@@ -75,66 +111,93 @@ class Shield(Sprite):
             return True
         return False
 
-    def draw(self):
-        """Draw the shield with energy field effect."""
+    def draw(self, alpha=1.0):
+        """Draw the cached shield frame plus its energy particles.
+
+        The shield follows the ship's interpolated position for alpha.
+        Return the rects drawn.
+        """
         if self.health <= 0:
-            return
-            
+            return []
+
+        # Quantize the pulse phase and health-based alpha
+        phase = int(self.pulse_offset / (2 * math.pi) * self.pulse_steps) % self.pulse_steps
+        health_ratio = self.health / self.max_health
+        current_alpha = int(self.alpha * health_ratio) // self.alpha_step * self.alpha_step
+
+        key = (self.radius, self.thickness, self.base_color, phase, current_alpha)
+        frame = self.frame_cache.get(key)
+        if frame is None:
+            frame = self._render_frame(phase, current_alpha)
+            self.frame_cache.put(key, frame)
+
+        # Blit to main screen, centered where the ship is drawn
+        body_rect = self.rect.copy()
+        ship_rect = self.ship.interpolated_rect(alpha)
+        body_rect.center = (ship_rect.centerx, ship_rect.centery - 10)
+        shield_rect = frame.get_rect()
+        shield_rect.center = body_rect.center
+        self.screen.blit(frame, shield_rect)
+
+        # Draw energy particles
+        for particle in self.energy_particles:
+            if particle['life'] > 0:
+                angle = particle['angle']
+                distance = particle['distance']
+                x = int(shield_rect.centerx + math.cos(angle) * distance)
+                y = int(shield_rect.centery + math.sin(angle) * distance)
+
+                particle_alpha = int(255 * (particle['life'] / 30) * health_ratio)
+                particle_alpha = particle_alpha // self.alpha_step * self.alpha_step
+                if particle_alpha > 0:
+                    self.screen.blit(self._particle_dot(particle_alpha), (x - 2, y - 2))
+
+        # Draw health indicator
+        return [shield_rect, self.draw_health_bar(body_rect)]
+
+    def _render_frame(self, phase, current_alpha):
+        """Render the shield rings and inner glow for one cached frame."""
         # Calculate pulsing effect
-        pulse = math.sin(self.pulse_offset) * 0.3 + 0.7
+        pulse = math.sin(phase * 2 * math.pi / self.pulse_steps) * 0.3 + 0.7
         current_radius = int(self.radius * pulse)
-        
-        # Calculate health-based alpha
-        health_ratio = self.health / self.max_health
-        current_alpha = int(self.alpha * health_ratio)
-        
+
         # Create surface for drawing with alpha
         shield_surface = pygame.Surface((self.radius * 2 + 20, self.radius * 2 + 20), pygame.SRCALPHA)
-        
+        center = (self.radius + 10, self.radius + 10)
+
         # Draw main shield circle with gradient effect
         for i in range(self.thickness):
             radius = current_radius - i * 2
             alpha = current_alpha - i * 20
             if radius > 0 and alpha > 0:
                 color = (*self.base_color, max(0, alpha))
-                center = (self.radius + 10, self.radius + 10)
                 pygame.draw.circle(shield_surface, color, center, radius, 2)
-        
-        # Draw energy particles
-        for particle in self.energy_particles:
-            if particle['life'] > 0:
-                angle = particle['angle']
-                distance = particle['distance']
-                x = int(self.radius + 10 + math.cos(angle) * distance)
-                y = int(self.radius + 10 + math.sin(angle) * distance)
-                
-                particle_alpha = int(255 * (particle['life'] / 30) * health_ratio)
-                if particle_alpha > 0:
-                    color = (*self.base_color, particle_alpha)
-                    pygame.draw.circle(shield_surface, color, (x, y), 2)
-        
+
         # Draw inner glow
         inner_color = (*self.base_color, int(current_alpha * 0.3))
-        center = (self.radius + 10, self.radius + 10)
         pygame.draw.circle(shield_surface, inner_color, center, current_radius - self.thickness, 0)
-        
-        # Blit to main screen
-        shield_rect = shield_surface.get_rect()
-        shield_rect.center = self.rect.center
-        self.screen.blit(shield_surface, shield_rect)
-        
-        # Draw health indicator
-        self.draw_health_bar()
-        
-    def draw_health_bar(self):
-        """Draw a small health bar above the shield."""
+        return shield_surface
+
+    def _particle_dot(self, alpha):
+        """Return a cached energy particle dot with the given alpha."""
+        key = ('dot', self.base_color, alpha)
+        dot = self.frame_cache.get(key)
+        if dot is None:
+            dot = pygame.Surface((5, 5), pygame.SRCALPHA)
+            pygame.draw.circle(dot, (*self.base_color, alpha), (2, 2), 2)
+            self.frame_cache.put(key, dot)
+        return dot
+
+    def draw_health_bar(self, rect=None):
+        """Draw a small health bar above the shield, or above rect."""
+        rect = rect or self.rect
         bar_width = 40
         bar_height = 4
-        bar_x = self.rect.centerx - bar_width // 2
-        bar_y = self.rect.top - 15
+        bar_x = rect.centerx - bar_width // 2
+        bar_y = rect.top - 15
         
         # Background (red)
-        pygame.draw.rect(self.screen, (100, 0, 0), 
+        bar_rect = pygame.draw.rect(self.screen, (100, 0, 0), 
                         (bar_x, bar_y, bar_width, bar_height))
         
         # Health (blue gradient)
@@ -143,4 +206,5 @@ class Shield(Sprite):
         if health_width > 0:
             color = (int(255 * (1 - health_ratio)), int(100 * health_ratio), int(255 * health_ratio))
             pygame.draw.rect(self.screen, color, 
-                            (bar_x, bar_y, health_width, bar_height))
\ No newline at end of file
+                            (bar_x, bar_y, health_width, bar_height))
+        return bar_rect
@@ -1,6 +1,7 @@
-import pygame
 from pygame.sprite import Sprite
 
+from assets import Assets
+
 class Ship(Sprite):
     """A class to manage the player's ship."""
 
@@ -11,8 +12,9 @@ class Ship(Sprite):
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
 
-        # Load the ship image and get its rect.
-        self.image = pygame.image.load('images/ship.bmp')
+        # Use the shared ship image and get its rect.
+        self.image = Assets.image('images/ship.bmp')
+        self.mask = Assets.mask('images/ship.bmp')
         self.rect = self.image.get_rect()
 
         # Start each new ship at the bottom center of the screen.
@@ -22,25 +24,36 @@ class Ship(Sprite):
         self.moving_right = False
         self.moving_left = False
 
-        # Store a decimal value for the ship's horizontal position.
+        # Store a decimal value for the ship's horizontal position,
+        #   and where it was on the previous tick for interpolation.
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
     def update(self):
         """Update the ship's position based on movement flags."""
+        self.prev_x = self.x
+        speed = self.settings.ship_speed * self.settings.tick_scale
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += speed
 
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= speed
 
         # Update rect object from self.x
         self.rect.x = self.x
 
-    def blitme(self):
+    def interpolated_rect(self, alpha=1.0):
+        """Return the ship's rect alpha of the way from its last tick to this one."""
+        rect = self.rect.copy()
+        rect.x = self.prev_x + (self.x - self.prev_x) * alpha
+        return rect
+
+    def blitme(self, alpha=1.0):
         """Draw the ship at its current location."""
-        self.screen.blit(self.image, self.rect)
+        return self.screen.blit(self.image, self.interpolated_rect(alpha))
 
-    def center_ship(self):
-        """Center the ship on the screen."""
-        self.rect.midbottom = self.screen_rect.midbottom
+    def center_ship(self, offset=0):
+        """Center the ship on the screen, offset pixels to the right."""
+        self.rect.midbottom = (self.screen_rect.centerx + offset, self.screen_rect.bottom)
         self.x = float(self.rect.x)
+        self.prev_x = self.x
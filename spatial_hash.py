@@ -0,0 +1,59 @@
+import numpy as np
+
+
+# Pair counts up to which testing every pair beats bucketing into cells
+DIRECT_PAIRS = 4096
+
+
+def overlapping_pairs(first, second, cell_size):
+    """Return the rows of first and second whose bounds overlap, as two arrays.
+
+    first and second have a row of left, top, right, bottom per rect.
+    Every rect is bucketed by the cells it covers, all at once, and rects
+    are only tested against those sharing a cell, so the cost grows with
+    the rects and their near neighbours rather than their product. Small
+    batches, up to DIRECT_PAIRS pairs, skip the grid and test every pair,
+    which is cheaper there. Pairs come sorted by first row, then second row.
+    """
+    if len(first) * len(second) <= DIRECT_PAIRS:
+        hit = ((first[:, 0:1] < second[:, 2]) & (first[:, 2:3] > second[:, 0])
+               & (first[:, 1:2] < second[:, 3]) & (first[:, 3:4] > second[:, 1]))
+        return hit.nonzero()
+    first_keys, first_rows = _cell_keys(first, cell_size)
+    second_keys, second_rows = _cell_keys(second, cell_size)
+    order = np.argsort(second_keys, kind='stable')
+    second_keys = second_keys[order]
+    second_rows = second_rows[order]
+
+    # Every (first, second) pair sharing a cell
+    start = np.searchsorted(second_keys, first_keys, 'left')
+    counts = np.searchsorted(second_keys, first_keys, 'right') - start
+    candidates = _spans(start, counts)
+    rows = np.unique(np.repeat(first_rows, counts) * len(second) + second_rows[candidates])
+    i, j = np.divmod(rows, len(second))
+
+    # Rects sharing a cell may still miss each other.
+    a, b = first[i], second[j]
+    hit = ((a[:, 0] < b[:, 2]) & (a[:, 2] > b[:, 0])
+           & (a[:, 1] < b[:, 3]) & (a[:, 3] > b[:, 1]))
+    return i[hit], j[hit]
+
+
+def _cell_keys(bounds, cell_size):
+    """Return (key, row) arrays with one entry per cell each rect covers."""
+    left = bounds[:, 0] // cell_size
+    top = bounds[:, 1] // cell_size
+    columns = (bounds[:, 2] - 1) // cell_size - left + 1
+    cells = columns * ((bounds[:, 3] - 1) // cell_size - top + 1)
+    rows = np.repeat(np.arange(len(bounds)), cells)
+    cell = _spans(np.zeros(len(bounds), np.int64), cells)
+    column = left[rows] + cell % columns[rows]
+    row = top[rows] + cell // columns[rows]
+    # Rows fit in 32 bits, so each (column, row) gets its own key.
+    return column * 2 ** 32 + row, rows
+
+
+def _spans(starts, counts):
+    """Return start, start + 1, ... start + count - 1 for each start and count, joined."""
+    ends = np.cumsum(counts)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - counts - starts, counts)
@@ -0,0 +1,70 @@
+import random
+import unittest
+
+import numpy as np
+
+from entities import Archetype
+
+
+class ArchetypeModelTest(unittest.TestCase):
+    """Check Archetype's row and id bookkeeping against a plain list model."""
+
+    def check(self, archetype, model):
+        """Assert archetype holds model's (entity, owner, x) rows in order."""
+        count = len(model)
+        self.assertEqual(len(archetype), count)
+        entities = [entity for entity, _, _ in model]
+        self.assertEqual(archetype.ids[:count].tolist(), entities)
+        self.assertEqual(archetype.owners[:count], [owner for _, owner, _ in model])
+        self.assertTrue(all(owner is None for owner in archetype.owners[count:]))
+        self.assertEqual(archetype['position'][:, 0].tolist(), [x for _, _, x in model])
+        self.assertEqual(archetype.rows[entities].tolist(), list(range(count)))
+
+        # Every id is either live or free, exactly once.
+        free = archetype.free_ids[:archetype.free_count].tolist()
+        self.assertEqual(len(set(free)), len(free))
+        self.assertFalse(set(free) & set(entities))
+        self.assertEqual(len(free) + count, len(archetype.ids))
+        self.assertTrue((archetype.rows[free] == -1).all())
+
+    def test_random_spawns_and_despawns(self):
+        rng = random.Random(0)
+        for capacity in (1, 4, 16):
+            archetype = Archetype('bullet', ['position'], capacity)
+            model = []
+            for step in range(2000):
+                action = rng.random()
+                if action < 0.5 or not model:
+                    owner = object()
+                    x = float(step)
+                    entity = archetype.spawn(owner, position=(x, 0.0))
+                    model.append((entity, owner, x))
+                elif action < 0.8:
+                    entity = rng.choice(model)[0]
+                    archetype.despawn(entity)
+                    model = [row for row in model if row[0] != entity]
+                else:
+                    doomed = rng.sample([row[0] for row in model],
+                                        rng.randint(1, len(model)))
+                    archetype.despawn_many(doomed)
+                    model = [row for row in model if row[0] not in doomed]
+                self.check(archetype, model)
+
+    def test_despawn_many_takes_an_array_or_nothing(self):
+        archetype = Archetype('bullet', ['position'])
+        entities = [archetype.spawn(position=(x, 0.0)) for x in range(5)]
+        archetype.despawn_many(np.array(entities[1::2]))
+        archetype.despawn_many([])
+        self.assertEqual(archetype.ids[:len(archetype)].tolist(), entities[::2])
+
+    def test_freed_ids_are_reused(self):
+        archetype = Archetype('bullet', ['position'], capacity=2)
+        first = archetype.spawn()
+        archetype.spawn()
+        archetype.despawn(first)
+        self.assertEqual(archetype.spawn(), first)
+        self.assertEqual(len(archetype.ids), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()